@@ -0,0 +1,111 @@
+"""
+Requests per second and latency percentiles of the event list under many
+concurrent keep-alive connections, for the ASGI async views against the WSGI
+DRF views.
+
+Seed a database and start both servers, then point the benchmark at them:
+    python manage.py migrate && python benchmarks/async_load.py --seed 10000
+    uvicorn events_manager.asgi:application --port 8001
+    gunicorn events_manager.wsgi --threads 32 --bind 127.0.0.1:8000
+    python benchmarks/async_load.py \\
+        --target wsgi=http://127.0.0.1:8000/api/events/ \\
+        --target asgi=http://127.0.0.1:8001/api/async/events/ \\
+        --connections 1000 --duration 30
+
+The load generator only uses asyncio from the standard library.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from utils import seed_events, setup_django
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(url, deadline, latencies, errors):
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+        "Accept: application/json\r\n\r\n"
+    ).encode()
+    try:
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    except OSError:
+        errors.append("connect")
+        return
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            status = await read_response(reader)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+    except (OSError, asyncio.IncompleteReadError) as exc:
+        errors.append(type(exc).__name__)
+    finally:
+        writer.close()
+
+
+async def load(url, connections, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(
+        *(client(url, deadline, latencies, errors) for _ in range(connections))
+    )
+    return latencies, errors
+
+
+def report(label, latencies, errors, duration):
+    if len(latencies) < 2:
+        print(f"{label:>6}: {len(latencies)} responses, {len(errors)} errors")
+        return
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:>6}: {len(latencies) / duration:8.0f} req/s, "
+        f"p50 {percentiles[49] * 1000:7.1f} ms, p99 {percentiles[98] * 1000:7.1f} ms, "
+        f"{len(errors)} errors"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--target", action="append", default=[], help="label=url, repeatable"
+    )
+    parser.add_argument("--connections", type=int, default=1_000)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument(
+        "--seed", type=int, help="insert this many events in DATABASES and exit"
+    )
+    args = parser.parse_args()
+
+    if args.seed:
+        setup_django()
+        seed_events(args.seed)
+        return
+
+    for target in args.target:
+        label, _, url = target.partition("=")
+        latencies, errors = asyncio.run(load(url, args.connections, args.duration))
+        report(label, latencies, errors, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Query plans and timings of attendee paging and per-user attendance history,
+with only the (event, user) unique constraint against the covering indexes of
+events.models.Attendance.
+
+Usage:
+    python benchmarks/attendance_plans.py --users 20000 --events 200
+"""
+
+import argparse
+import random
+
+from utils import measure, seed_events, setup_django, test_database
+
+
+def seed_attendances(users, events, per_user, batch_size=10_000):
+    """Subscribe every user to per_user random events, at increasing times"""
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from events.models import Attendance, Event
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        (User(email=f"attendee{index}@example.com") for index in range(users)),
+        batch_size=batch_size,
+    )
+    user_ids = list(User.objects.values_list("pk", flat=True))
+    event_ids = list(Event.objects.values_list("pk", flat=True)[:events])
+    rng = random.Random(42)
+    start = timezone.now() - timezone.timedelta(days=365)
+
+    rows = []
+    for index, user_id in enumerate(user_ids):
+        for event_id in rng.sample(event_ids, per_user):
+            rows.append(
+                Attendance(
+                    event_id=event_id,
+                    user_id=user_id,
+                    subscribed_at=start + timezone.timedelta(seconds=index),
+                )
+            )
+    Attendance.objects.bulk_create(rows, batch_size=batch_size)
+    return event_ids[0], user_ids[len(user_ids) // 2]
+
+
+def hot_queries(event_id, user_id, page_size):
+    from events.models import Attendance
+
+    return {
+        "attendees of an event, in signup order": Attendance.objects.filter(
+            event_id=event_id
+        )
+        .order_by("subscribed_at", "user_id")
+        .values("user_id", "subscribed_at")[: page_size + 1],
+        "events of a user, by date": Attendance.objects.filter(user_id=user_id)
+        .order_by("-subscribed_at", "-event_id")
+        .values("event_id", "subscribed_at")[: page_size + 1],
+    }
+
+
+def report(title, event_id, user_id, page_size):
+    print(f"\n=== {title}")
+    for label, queryset in hot_queries(event_id, user_id, page_size).items():
+        duration = measure(lambda: list(queryset.all()))
+        print(f"\n--- {label}: {duration:.2f} ms")
+        print(queryset.explain())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--per-user", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from events.models import Attendance
+
+    with test_database() as connection:
+        seed_events(args.events)
+        event_id, user_id = seed_attendances(args.users, args.events, args.per_user)
+        print(f"{Attendance.objects.count()} attendances on {connection.vendor}")
+
+        indexes = Attendance._meta.indexes
+        with connection.schema_editor() as schema_editor:
+            for index in indexes:
+                schema_editor.remove_index(Attendance, index)
+        report("Unique constraint only", event_id, user_id, args.page_size)
+
+        with connection.schema_editor() as schema_editor:
+            for index in indexes:
+                schema_editor.add_index(Attendance, index)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        report("Covering indexes", event_id, user_id, args.page_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Per-request database cost with a new connection per request against persistent
+connections, with and without health checks.
+
+Usage:
+    DB_NAME=events DB_USER=postgres DB_HOST=localhost python benchmarks/db_connections.py
+
+Each simulated request goes through the request_started and request_finished
+handling of Django and runs one primary key lookup. Run it against PostgreSQL,
+directly and through PgBouncer (DB_PORT=6432 DB_PGBOUNCER=1): SQLite keeps the
+in-memory test database open whatever CONN_MAX_AGE says.
+"""
+
+import argparse
+
+from utils import measure, setup_django, test_database
+
+MODES = {
+    "new connection per request": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistent": {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": False},
+    "persistent, health checks": {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1_000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.signals import request_finished, request_started
+
+    from events.models import Event
+
+    def request():
+        request_started.send(sender=None)
+        Event.objects.filter(pk=1).exists()
+        request_finished.send(sender=None)
+
+    def requests():
+        for _ in range(args.requests):
+            request()
+
+    with test_database() as connection:
+        print(f"{args.requests} requests on {connection.vendor}")
+        for label, options in MODES.items():
+            connection.close()
+            connection.settings_dict.update(options)
+            duration = measure(requests, repeat=3)
+            print(f"{label:>28}: {duration / args.requests:8.3f} ms per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Peak memory and time to first byte of the streaming event export against
+rendering the same events in memory with the list serializer.
+
+Usage:
+    python benchmarks/event_export.py --rows 10000 100000 1000000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from utils import seed_events, setup_django, test_database
+
+
+def streamed(queryset):
+    from events import export
+
+    chunks = export.to_ndjson(export.get_rows(queryset))
+    start = time.perf_counter()
+    next(chunks)
+    first_byte = time.perf_counter() - start
+    for _ in chunks:
+        pass
+    return first_byte
+
+
+def in_memory(queryset):
+    from rest_framework.renderers import JSONRenderer
+
+    from events.serializers import EventListCreateSerializer
+
+    start = time.perf_counter()
+    data = EventListCreateSerializer(queryset.with_status(), many=True).data
+    JSONRenderer().render(data)
+    return time.perf_counter() - start
+
+
+def run(label, func, queryset):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_byte = func(queryset)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:>10}: first byte {first_byte * 1000:9.1f} ms, "
+        f"total {total:7.2f} s, peak {peak / 2**20:8.1f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    setup_django()
+    # Imported before tracing, module loading is not part of the measure
+    from rest_framework.renderers import JSONRenderer  # noqa: F401
+
+    from events import export  # noqa: F401
+    from events.models import Event
+
+    with test_database():
+        seeded = 0
+        for rows in sorted(args.rows):
+            seed_events(rows - seeded, email=f"bench{rows}@example.com")
+            seeded = rows
+            queryset = Event.objects.order_by("start_date", "id")
+            print(f"\n=== {rows} events")
+            run("streamed", streamed, queryset)
+            run("in memory", in_memory, queryset)
+
+
+if __name__ == "__main__":
+    main()
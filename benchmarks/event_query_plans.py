@@ -0,0 +1,90 @@
+"""
+Query plans and timings of the event list hot queries without and with the list
+indexes of events/migrations/0002_event_indexes.py.
+
+The schema is migrated to the latest state and seeded through the Event model, then
+the list indexes are dropped for the first report and created again for the second.
+
+Usage:
+    python benchmarks/event_query_plans.py --rows 1000000
+
+Point DATABASES at PostgreSQL to see the pg_trgm indexes used by icontains.
+"""
+
+import argparse
+import importlib
+
+from utils import measure, seed_events, setup_django, test_database
+
+LIST_INDEXES = [
+    "event_active_start_idx",
+    "event_upcoming_start_idx",
+    "event_start_date_id_idx",
+]
+
+
+def hot_queries():
+    from events.mixins import QuerysetFilterMixin
+    from events.models import Event
+
+    filters = QuerysetFilterMixin()
+    ordered = Event.objects.order_by("start_date", "id")
+    return {
+        "first page": ordered,
+        "status=future": ordered.filter(filters.get_status_filter("future")),
+        "status=past": ordered.filter(filters.get_status_filter("past")),
+        "status=cancelled": ordered.filter(filters.get_status_filter("cancelled")),
+        "name contains": ordered.filter(name__icontains="jazz night 99"),
+        "event_type contains": ordered.filter(event_type__icontains="conc"),
+    }
+
+
+def report(title, page_size):
+    print(f"\n=== {title}")
+    for label, queryset in hot_queries().items():
+        page = queryset[: page_size + 1]
+        duration = measure(lambda: list(page.all()))
+        print(f"\n--- {label}: {duration:.2f} ms")
+        print(page.explain())
+
+
+def set_list_indexes(connection, enabled):
+    """Create or drop the list indexes, the trigram ones included on PostgreSQL"""
+    from events.models import Event
+
+    migration = importlib.import_module("events.migrations.0002_event_indexes")
+    indexes = [index for index in Event._meta.indexes if index.name in LIST_INDEXES]
+    with connection.schema_editor() as schema_editor:
+        for index in indexes:
+            if enabled:
+                schema_editor.add_index(Event, index)
+            else:
+                schema_editor.remove_index(Event, index)
+        if enabled:
+            migration.create_trigram_indexes(None, schema_editor)
+        else:
+            migration.drop_trigram_indexes(None, schema_editor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    with test_database() as connection:
+        print(f"Seeding {args.rows} events on {connection.vendor}")
+        seed_events(args.rows)
+
+        set_list_indexes(connection, enabled=False)
+        report("Before indexes", args.page_size)
+        set_list_indexes(connection, enabled=True)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        report("After indexes", args.page_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Latency of the first page of a full-text search against the icontains filters.
+
+Usage:
+    python benchmarks/event_search.py --rows 1000000
+
+Point DATABASES at PostgreSQL to measure the tsvector column and its GIN index.
+"""
+
+import argparse
+
+from utils import measure, seed_events, setup_django, test_database
+
+
+def first_pages(text):
+    from django.db.models import Q
+
+    from events.models import Event
+    from events.search import search
+
+    icontains = Q(name__icontains=text) | Q(description__icontains=text)
+    return {
+        f"q={text}": search(Event.objects.all(), text).order_by("-rank", "id"),
+        f"icontains {text}": Event.objects.filter(icontains).order_by(
+            "start_date", "id"
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    with test_database() as connection:
+        print(f"Seeding {args.rows} events on {connection.vendor}")
+        seed_events(args.rows)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        # A frequent word, a rare one and a word that matches nothing
+        for text in ("jazz", f"session {args.rows // 2}", "opera"):
+            for label, queryset in first_pages(text).items():
+                page = queryset[: args.page_size + 1]
+                duration = measure(lambda: list(page.all()))
+                print(f"{label:>30}: {duration:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Rendering time of an event list response, DRF's JSONRenderer against ORJSONRenderer,
+and parsing time of the rendered body, JSONParser against ORJSONParser.
+
+Usage:
+    python benchmarks/json_renderer.py --rows 10000
+"""
+
+import argparse
+import io
+
+from utils import measure, seed_events, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from events.models import Event
+    from events.serializers import EventListValuesSerializer
+    from events_manager.parsers import ORJSONParser
+    from events_manager.renderers import ORJSONRenderer
+
+    with test_database():
+        seed_events(args.rows)
+        queryset = Event.objects.order_by("start_date", "id")
+        rows = EventListValuesSerializer.get_rows(queryset)
+        # The shape of a list page, only rendering is measured
+        data = {
+            "next": None,
+            "previous": None,
+            "results": EventListValuesSerializer(rows, many=True).data,
+        }
+
+        content = JSONRenderer().render(data)
+        assert ORJSONRenderer().render(data) == content
+
+        drf = measure(lambda: JSONRenderer().render(data), args.repeat)
+        fast = measure(lambda: ORJSONRenderer().render(data), args.repeat)
+        drf_parse = measure(
+            lambda: JSONParser().parse(io.BytesIO(content)), args.repeat
+        )
+        fast_parse = measure(
+            lambda: ORJSONParser().parse(io.BytesIO(content)), args.repeat
+        )
+        print(f"{args.rows} events, {len(content) / 1024:.0f} KiB")
+        print(f"JSONRenderer:   {drf:9.2f} ms")
+        print(f"ORJSONRenderer: {fast:9.2f} ms ({drf / fast:.1f}x)")
+        print(f"JSONParser:     {drf_parse:9.2f} ms")
+        print(f"ORJSONParser:   {fast_parse:9.2f} ms ({drf_parse / fast_parse:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Serialization time of event list rows, EventListCreateSerializer on model
+instances against EventListValuesSerializer on values() rows.
+
+Usage:
+    python benchmarks/list_serializer.py --rows 10000
+"""
+
+import argparse
+
+from utils import measure, seed_events, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from events.models import Event
+    from events.serializers import (
+        EventListCreateSerializer,
+        EventListValuesSerializer,
+    )
+
+    with test_database():
+        seed_events(args.rows)
+        queryset = Event.objects.order_by("start_date", "id")
+        # Rows are fetched once, only serialization is measured
+        instances = list(queryset.with_status())
+        rows = list(EventListValuesSerializer.get_rows(queryset))
+
+        model = measure(
+            lambda: EventListCreateSerializer(instances, many=True).data, args.repeat
+        )
+        values = measure(
+            lambda: EventListValuesSerializer(rows, many=True).data, args.repeat
+        )
+        print(f"{args.rows} events")
+        print(f"EventListCreateSerializer: {model:9.2f} ms")
+        print(f"EventListValuesSerializer: {values:9.2f} ms ({model / values:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Subscribe throughput on one hot event, counting on the event row against sharded counters.
+
+Each run subscribes --users users to a fresh event that has seats for half of them,
+with 0 (the event row), 1, 8 and 32 counter shards and every --threads concurrency.
+Contention only shows against PostgreSQL, SQLite allows one writer at a time, so
+keep --threads 1 there.
+
+Usage:
+    python benchmarks/sharded_counter.py --users 2000
+    DB_NAME=events python benchmarks/sharded_counter.py --users 5000 --threads 1 8 32 64
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import seed_events, setup_django, test_database
+
+
+def run_subscribes(subscribe, event_id, user_ids, threads):
+    """Subscribe every user, return the elapsed milliseconds"""
+    from django.db import connection
+
+    def send(user_id):
+        try:
+            return subscribe(event_id, user_id)
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(send, user_ids))
+    else:
+        for user_id in user_ids:
+            subscribe(event_id, user_id)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1])
+    parser.add_argument("--shards", type=int, nargs="+", default=[0, 1, 8, 32])
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.test import override_settings
+
+    from events import counters, subscriptions
+    from events.models import Attendance, Event
+
+    User = get_user_model()
+
+    with test_database():
+        runs = [(shards, threads) for shards in args.shards for threads in args.threads]
+        seed_events(len(runs))
+        events = list(Event.objects.order_by("pk"))
+        seats = args.users // 2
+        Event.objects.update(maximum_attendees=seats, attendee_count=0)
+        User.objects.bulk_create(
+            (User(email=f"fan{index}@example.com") for index in range(args.users)),
+            batch_size=10_000,
+        )
+        user_ids = list(
+            User.objects.filter(email__startswith="fan").values_list("pk", flat=True)
+        )
+
+        print(f"{args.users} subscribes to one event with {seats} seats")
+        print(f"{'shards':>6} {'threads':>7} {'ms':>9} {'subscribes/s':>13}")
+        for event, (shards, threads) in zip(events, runs):
+            with override_settings(EVENTS_ATTENDEE_SHARDS=shards):
+                elapsed = run_subscribes(
+                    subscriptions.subscribe, event.pk, user_ids, threads
+                )
+                counters.compact(event.pk)
+            event.refresh_from_db()
+            assert event.attendee_count == seats
+            assert Attendance.objects.filter(event=event).count() == seats
+            label = shards or "row"
+            print(
+                f"{label:>6} {threads:>7} {elapsed:9.0f} "
+                f"{args.users / elapsed * 1000:13.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Subscribes to one hot event, direct subscribes against queued tickets decided in batches.
+
+Every request of the direct mode takes the event row lock. In queued mode requests
+only insert a ticket, and the worker takes the lock once per batch. Against
+PostgreSQL, use --threads to send the requests concurrently; SQLite allows one
+writer at a time.
+
+Usage:
+    python benchmarks/subscribe_queue.py --users 5000
+    DB_NAME=events python benchmarks/subscribe_queue.py --users 5000 --threads 32
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import seed_events, setup_django, test_database
+
+
+def run_requests(action, event_id, user_ids, threads):
+    """Send one action per user, return the elapsed milliseconds"""
+    from django.db import connection
+
+    def send(user_id):
+        try:
+            return action(event_id, user_id)
+        finally:
+            if threads > 1:
+                connection.close()
+
+    start = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(send, user_ids))
+    else:
+        for user_id in user_ids:
+            action(event_id, user_id)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+
+    from events import subscriptions, tickets
+    from events.models import Attendance, Event, SubscriptionTicket, WaitlistEntry
+
+    User = get_user_model()
+
+    with test_database():
+        seed_events(2)
+        direct_event, queued_event = Event.objects.all()
+        # Half of the users get a seat, the others are waitlisted
+        Event.objects.update(maximum_attendees=args.users // 2)
+        User.objects.bulk_create(
+            (User(email=f"fan{index}@example.com") for index in range(args.users)),
+            batch_size=10_000,
+        )
+        user_ids = list(
+            User.objects.filter(email__startswith="fan").values_list("pk", flat=True)
+        )
+
+        direct = run_requests(
+            subscriptions.subscribe, direct_event.pk, user_ids, args.threads
+        )
+        enqueue = run_requests(
+            tickets.request_subscription, queued_event.pk, user_ids, args.threads
+        )
+        start = time.perf_counter()
+        while tickets.process_tickets(args.batch_size):
+            pass
+        drain = (time.perf_counter() - start) * 1000
+
+        for event in (direct_event, queued_event):
+            assert Attendance.objects.filter(event=event).count() == args.users // 2
+            assert WaitlistEntry.objects.filter(event=event).count() == (
+                args.users - args.users // 2
+            )
+        assert not SubscriptionTicket.objects.filter(status="pending").exists()
+
+        print(f"{args.users} subscribes to one event, {args.threads} thread(s)")
+        print(
+            f"direct:         {direct:9.0f} ms, "
+            f"{args.users / direct * 1000:8.0f} subscribes/s"
+        )
+        print(
+            f"queued enqueue: {enqueue:9.0f} ms, "
+            f"{args.users / enqueue * 1000:8.0f} requests/s"
+        )
+        print(
+            f"queued drain:   {drain:9.0f} ms, "
+            f"{args.users / drain * 1000:8.0f} subscribes/s "
+            f"(batches of {args.batch_size})"
+        )
+
+
+if __name__ == "__main__":
+    main()
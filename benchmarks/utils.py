@@ -0,0 +1,86 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Benchmarks run against a throwaway test database created from the configured
+DATABASES, so they never touch the development data.
+"""
+
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "events_manager.settings")
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database(keepdb=False):
+    """Create and migrate the test database, dropping it on exit"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb
+    )
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def measure(func, repeat=5):
+    """Run func repeat times and return the median duration in milliseconds"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def seed_events(count, batch_size=10_000, email="bench@example.com"):
+    """Insert count events spread over two years, a tenth of them cancelled"""
+    import random
+
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from events.models import Event
+
+    owner = get_user_model().objects.create_user(email=email)
+    now = timezone.now()
+    words = ["Wine", "Jazz", "Yoga", "Startup", "Python", "Cooking", "Chess", "Film"]
+    types = ["Meeting", "Concert", "Workshop", "Conference", "Tasting"]
+    rng = random.Random(42)
+
+    for offset in range(0, count, batch_size):
+        events = []
+        for index in range(offset, min(offset + batch_size, count)):
+            start_date = now + timezone.timedelta(
+                minutes=rng.randint(-525_600, 525_600)
+            )
+            word = rng.choice(words)
+            events.append(
+                Event(
+                    name=f"{word} night {index}",
+                    owner=owner,
+                    description=f"A {word.lower()} evening, session {index}",
+                    start_date=start_date,
+                    end_date=start_date + timezone.timedelta(hours=3),
+                    event_type=rng.choice(types),
+                    active=rng.random() > 0.1,
+                )
+            )
+        Event.objects.bulk_create(events)
+    return owner
@@ -0,0 +1,22 @@
+from django.urls import path
+
+from .async_views import (
+    AsyncEventDetailView,
+    AsyncEventListView,
+    AsyncEventSubscribeView,
+)
+
+urlpatterns = [
+    path("", AsyncEventListView.as_view(), name="async-events-list"),
+    path("<int:pk>/", AsyncEventDetailView.as_view(), name="async-events-detail"),
+    path(
+        "<int:pk>/subscribe/",
+        AsyncEventSubscribeView.as_view(),
+        name="async-events-subscribe",
+    ),
+    path(
+        "<int:pk>/unsubscribe/",
+        AsyncEventSubscribeView.as_view(unsubscribe=True),
+        name="async-events-unsubscribe",
+    ),
+]
@@ -0,0 +1,154 @@
+"""
+Async versions of the event list, detail and subscribe endpoints, under /api/async/events/.
+
+They query through the async ORM, so under ASGI a request waits on the database
+without holding a worker thread. Their responses match the DRF views, which stay
+the reference: DRF 3.14 has no async views, these are plain Django views reusing
+the filters, the pagination and the serializers.
+
+Subscribing runs in a thread with sync_to_async, Django 4.1 has neither async
+transactions nor an async m2m add. Conditional GETs and the response cache are
+only on the DRF views.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import reverse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound
+from rest_framework.request import Request
+
+from events_manager.renderers import ORJSONRenderer
+from users.authentication import StatelessJWTAuthentication
+
+from . import subscriptions, tickets
+from .mixins import QuerysetFilterMixin
+from .models import Event
+from .pagination import EventCursorPagination
+from .serializers import EventDetailUpdateSerializer, EventListValuesSerializer
+
+
+def render(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(
+        ORJSONRenderer().render(data),
+        content_type="application/json",
+        status=status_code,
+    )
+
+
+class AsyncAPIView(View):
+    """Turns the API exceptions raised by the handlers into DRF style responses"""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # As DRF's APIView: JWT requests carry no CSRF token, and cookie sessions
+        # do not authenticate these views.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            response = render(exc.detail, exc.status_code)
+            if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                response["WWW-Authenticate"] = (
+                    StatelessJWTAuthentication().authenticate_header(request)
+                )
+            return response
+
+
+class AsyncEventListView(QuerysetFilterMixin, AsyncAPIView):
+    """Async EventsListCreateView, the list only"""
+
+    async def get(self, request):
+        # The filters and the paginator read query_params from a DRF request
+        self.request = Request(request)
+        queryset = self.filter_queryset(Event.objects.all())
+        rows = EventListValuesSerializer.get_rows(queryset)
+
+        paginator = EventCursorPagination()
+        page_queryset = paginator.get_page_queryset(rows, self.request, self)
+        page = paginator.set_page([row async for row in page_queryset.aiterator()])
+
+        return render(
+            {
+                "next": paginator.get_next_link(),
+                "previous": paginator.get_previous_link(),
+                "results": EventListValuesSerializer(page, many=True).data,
+            }
+        )
+
+
+class AsyncEventDetailView(AsyncAPIView):
+    """Async EventsDetailUpdateView, the detail only and without expand=attendees"""
+
+    async def get(self, request, pk):
+        try:
+            event = await Event.objects.with_status().aget(pk=pk)
+        except Event.DoesNotExist:
+            raise NotFound()
+        return render(
+            EventDetailUpdateSerializer(event, context={"expand": set()}).data
+        )
+
+
+class AsyncEventSubscribeView(AsyncAPIView):
+    """Async EventSubscribeAndUnsubscribeView, see `unsubscribe`"""
+
+    unsubscribe = False
+    messages = {
+        subscriptions.SUBSCRIBED: "Subscribed to the event",
+        subscriptions.WAITLISTED: "Event is full, added to the waitlist",
+        subscriptions.UNSUBSCRIBED: "Unsubscribed from the event",
+        subscriptions.LEFT_WAITLIST: "Removed from the waitlist",
+    }
+    error_messages = {
+        subscriptions.ALREADY_SUBSCRIBED: "Already Subscribed",
+        subscriptions.ALREADY_WAITLISTED: "Already on the waitlist",
+        subscriptions.NOT_SUBSCRIBED: "Already Unsubscribed",
+    }
+
+    async def put(self, request, pk):
+        # Tokens without the user claims are checked against the database
+        authenticated = await sync_to_async(StatelessJWTAuthentication().authenticate)(
+            Request(request)
+        )
+        if authenticated is None:
+            raise NotAuthenticated()
+        user, _ = authenticated
+        # replica_middleware pins the user to the primary after the write
+        request.user = user
+
+        if not await Event.objects.filter(pk=pk).aexists():
+            raise NotFound()
+
+        if settings.EVENTS_SUBSCRIBE_QUEUE:
+            if not self.unsubscribe:
+                ticket = await sync_to_async(tickets.request_subscription)(pk, user.pk)
+                response = render(
+                    {"message": "Subscription queued", "ticket": ticket.pk},
+                    status.HTTP_202_ACCEPTED,
+                )
+                response["Location"] = reverse(
+                    "events-subscription-ticket", kwargs={"pk": ticket.pk}
+                )
+                return response
+            if await sync_to_async(tickets.cancel_subscription)(pk, user.pk):
+                return render({"message": "Subscription request cancelled"})
+
+        if self.unsubscribe:
+            outcome = await sync_to_async(subscriptions.unsubscribe)(pk, user.pk)
+        else:
+            outcome = await sync_to_async(subscriptions.subscribe)(pk, user.pk)
+
+        if outcome == subscriptions.NOT_FOUND:
+            raise NotFound()
+        if outcome in self.error_messages:
+            return render(
+                {"message": self.error_messages[outcome]},
+                status.HTTP_400_BAD_REQUEST,
+            )
+        return render({"message": self.messages[outcome]})
@@ -0,0 +1,120 @@
+"""
+Versioned response cache for the event endpoints.
+
+Cache keys embed version numbers instead of being deleted on writes: bumping the
+list version invalidates every cached list page at once, and each event has its own
+detail version. Stale entries are never read again and expire on their own.
+
+Versions are bumped once the writing transaction commits: a read between an earlier
+bump and the commit would cache the old rows under the new version. For the same
+reason, a response read from a replica is not cached while one of its versions was
+bumped less than DATABASE_PRIMARY_STICKY_SECONDS ago, see written_recently.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+LIST_VERSION_KEY = "events:version:list"
+# time.time_ns() of the last list version bump
+LIST_MODIFIED_KEY = "events:version:list:modified"
+HITS_KEY = "events:stats:hits"
+MISSES_KEY = "events:stats:misses"
+
+
+def get_cache():
+    return caches[settings.EVENTS_CACHE_ALIAS]
+
+
+def detail_version_key(event_id):
+    return f"events:version:detail:{event_id}"
+
+
+def _new_version():
+    # A lost version key must not restart at a number already used by cached entries.
+    return time.time_ns()
+
+
+def get_versions(*keys):
+    cache = get_cache()
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def written_key(version_key):
+    return f"{version_key}:written"
+
+
+def bump_version(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), timeout=None)
+    cache.set(written_key(key), True, timeout=settings.DATABASE_PRIMARY_STICKY_SECONDS)
+
+
+def written_recently(version_keys):
+    """Whether a replica may still miss a write behind one of the versions"""
+    return bool(get_cache().get_many([written_key(key) for key in version_keys]))
+
+
+def invalidate_event(event_id):
+    """Drop the cached list pages and the cached detail of the event"""
+    transaction.on_commit(lambda: _bump_event(event_id))
+
+
+def invalidate_list():
+    transaction.on_commit(_bump_list)
+
+
+def _bump_list():
+    bump_version(LIST_VERSION_KEY)
+    get_cache().set(LIST_MODIFIED_KEY, time.time_ns(), timeout=None)
+
+
+def _bump_event(event_id):
+    _bump_list()
+    bump_version(detail_version_key(event_id))
+
+
+def response_key(request, version_keys):
+    """Key of the response to request, the query params in a normalized order"""
+    query = sorted(
+        (key, sorted(values)) for key, values in request.query_params.lists()
+    )
+    versions = get_versions(*version_keys)
+    raw_key = f"{request.get_host()}{request.path}|{query}|{versions}"
+    return "events:response:" + hashlib.sha256(raw_key.encode()).hexdigest()
+
+
+def get_response(key):
+    cache = get_cache()
+    data = cache.get(key)
+    _count(HITS_KEY if data is not None else MISSES_KEY)
+    return data
+
+
+def set_response(key, data):
+    get_cache().set(key, data, timeout=settings.EVENTS_CACHE_TIMEOUT)
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_stats():
+    stats = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    return {"hits": stats.get(HITS_KEY, 0), "misses": stats.get(MISSES_KEY, 0)}
@@ -0,0 +1,145 @@
+"""
+Sharded attendee counter, enabled by EVENTS_ATTENDEE_SHARDS.
+
+The free seats of an event are split between EVENTS_ATTENDEE_SHARDS rows of
+AttendeeCountShard. A subscribe takes a seat with a conditional UPDATE on a
+random shard, then on the other shards with room, so concurrent subscribes lock
+different rows instead of all queueing on the event row, and a shard never hands
+out more seats than it was given.
+
+Event.attendee_count plus the count of the shards is the number of attendees.
+Every other write to attendance runs inside `folded`, which locks the event, moves
+the shard counts into attendee_count and the seats back to the event, and spreads
+the free seats over the shards again at the end. Compaction does the same on its
+own, attendee_count is the total readers see, behind by the seats taken since.
+"""
+
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import cache as event_cache
+from .models import AttendeeCountShard, Event
+
+
+def enabled():
+    return settings.EVENTS_ATTENDEE_SHARDS > 0
+
+
+def reserve(event_id):
+    """Take a seat from the shards and return whether there was one"""
+    slot = random.randrange(settings.EVENTS_ATTENDEE_SHARDS)
+    if _take(event_id, slot):
+        return True
+    others = (
+        AttendeeCountShard.objects.filter(event_id=event_id, count__lt=F("capacity"))
+        .exclude(slot=slot)
+        .values_list("slot", flat=True)
+    )
+    return any(_take(event_id, other) for other in others)
+
+
+def _take(event_id, slot):
+    return AttendeeCountShard.objects.filter(
+        event_id=event_id, slot=slot, count__lt=F("capacity")
+    ).update(count=F("count") + 1)
+
+
+@contextmanager
+def folded(event_id):
+    """
+    Lock the event and make its attendee_count exact for the block, with no seats
+    left in the shards. Used by every write but the one of reserve. Does nothing
+    while the counter is disabled.
+    """
+    if not enabled():
+        yield
+        return
+    with transaction.atomic():
+        locked = _lock(event_id)
+        if locked:
+            existing = _absorb(event_id)
+        yield
+        if locked and not transaction.get_rollback():
+            _spread(event_id, existing)
+
+
+def compact(event_id):
+    """Fold the shard counts into attendee_count and share out the free seats again"""
+    with transaction.atomic():
+        if not _lock(event_id):
+            return
+        existing = _absorb(event_id)
+        if enabled():
+            _spread(event_id, existing)
+    event_cache.invalidate_event(event_id)
+
+
+def events_to_compact():
+    """Events with seats taken since their last compaction, or shards left when disabled"""
+    condition = Q(count__gt=0)
+    if not enabled():
+        condition |= Q(capacity__gt=0)
+    return (
+        AttendeeCountShard.objects.filter(condition)
+        .values_list("event_id", flat=True)
+        .distinct()
+    )
+
+
+def _lock(event_id):
+    # FOR NO KEY UPDATE: the attendance inserts of reserve, which only take a key
+    # share lock on the event row, go on while it is held.
+    return bool(
+        Event.objects.select_for_update(no_key=True)
+        .filter(pk=event_id)
+        .values_list("pk", flat=True)
+    )
+
+
+def _absorb(event_id):
+    """Empty the shards into the event and return their {slot: pk}"""
+    shards = AttendeeCountShard.objects.filter(event_id=event_id)
+    rows = list(
+        shards.select_for_update()
+        .order_by("slot")
+        .values_list("slot", "pk", "count", "capacity")
+    )
+    taken = sum(row[2] for row in rows)
+    if any(row[3] for row in rows):
+        shards.update(count=0, capacity=0)
+    if taken:
+        Event.objects.filter(pk=event_id).update(
+            attendee_count=F("attendee_count") + taken,
+            attendees_updated_date=timezone.now(),
+        )
+    return {slot: pk for slot, pk, _, _ in rows}
+
+
+def _spread(event_id, existing):
+    size = settings.EVENTS_ATTENDEE_SHARDS
+    attendee_count, maximum_attendees = Event.objects.values_list(
+        "attendee_count", "maximum_attendees"
+    ).get(pk=event_id)
+    free = max(maximum_attendees - attendee_count, 0)
+    if not free and len(existing) >= size:
+        # A full event, its waitlisted subscribes leave the shards alone
+        return
+    shards = [
+        AttendeeCountShard(
+            pk=existing.get(slot),
+            event_id=event_id,
+            slot=slot,
+            capacity=free // size + (slot < free % size),
+        )
+        for slot in range(size)
+    ]
+    # The existing shards were emptied by _absorb
+    AttendeeCountShard.objects.bulk_update(
+        [shard for shard in shards if shard.pk and shard.capacity], ["capacity"]
+    )
+    AttendeeCountShard.objects.bulk_create([shard for shard in shards if not shard.pk])
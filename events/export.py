@@ -0,0 +1,90 @@
+"""
+Row encoders of the event export, see events.views.EventExportView.
+
+Rows are plain dicts from values(), each format turns an iterable of rows into an
+iterable of text chunks so the response starts before the last row is read.
+"""
+
+import csv
+import io
+from datetime import datetime
+from itertools import islice
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import EventListValuesSerializer
+
+# The fields of the event list
+FIELDS = EventListValuesSerializer.fields
+
+
+def get_rows(queryset):
+    """Rows of the queryset as in the event list, fetched chunk by chunk"""
+    serializer = EventListValuesSerializer(None)
+    rows = EventListValuesSerializer.get_rows(queryset)
+    for row in rows.iterator(chunk_size=settings.EVENTS_EXPORT_CHUNK_SIZE):
+        yield serializer.to_representation(row)
+
+
+def _chunks(lines):
+    """Joins lines so each write to the client carries a chunk of rows"""
+    lines = iter(lines)
+    while chunk := "".join(islice(lines, settings.EVENTS_EXPORT_CHUNK_SIZE)):
+        yield chunk
+
+
+# Encodes like the compact unicode JSONRenderer of the list endpoint
+_encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _dumps(row):
+    text = _encoder.encode({field: row[field] for field in FIELDS})
+    return text.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+
+
+def to_ndjson(rows):
+    return _chunks(f"{_dumps(row)}\n" for row in rows)
+
+
+def to_json(rows):
+    def lines():
+        yield "["
+        separator = ""
+        for row in rows:
+            yield separator + _dumps(row)
+            separator = ","
+        yield "]"
+
+    return _chunks(lines())
+
+
+def to_csv(rows):
+    encoder = JSONEncoder()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    def lines():
+        yield line(FIELDS)
+        for row in rows:
+            # Dates are written like in the JSON formats
+            yield line(
+                encoder.default(value) if isinstance(value, datetime) else value
+                for value in (row[field] for field in FIELDS)
+            )
+
+    return _chunks(lines())
+
+
+FORMATS = {
+    "json": (to_json, "application/json"),
+    "ndjson": (to_ndjson, "application/x-ndjson"),
+    "csv": (to_csv, "text/csv"),
+}
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from events import counters
+
+
+class Command(BaseCommand):
+    help = "Fold the sharded attendee counters into the events, see events/counters.py"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.EVENTS_ATTENDEE_SHARDS_COMPACT_INTERVAL,
+            help="Seconds between two compactions",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Compact once and exit, also after disabling the shards",
+        )
+
+    def handle(self, *args, interval, once, **options):
+        total = 0
+        while True:
+            event_ids = list(counters.events_to_compact())
+            for event_id in event_ids:
+                counters.compact(event_id)
+            total += len(event_ids)
+            if once:
+                break
+            time.sleep(interval)
+        self.stdout.write(f"Compacted {total} events")
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from events import tickets
+
+
+class Command(BaseCommand):
+    help = "Decide the queued subscribe requests, see events/tickets.py"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EVENTS_SUBSCRIBE_QUEUE_BATCH_SIZE,
+            help="Tickets decided per transaction",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.EVENTS_SUBSCRIBE_QUEUE_INTERVAL,
+            help="Seconds to wait when the queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of waiting for tickets",
+        )
+
+    def handle(self, *args, batch_size, interval, once, **options):
+        total = 0
+        while True:
+            processed = tickets.process_tickets(batch_size)
+            total += processed
+            if processed:
+                continue
+            if once:
+                break
+            time.sleep(interval)
+        self.stdout.write(f"Processed {total} tickets")
@@ -0,0 +1,61 @@
+# Generated by Django 4.1.7 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+# icontains compiles to UPPER("column"::text) LIKE UPPER(%s) on PostgreSQL, so the
+# trigram indexes are built on that expression for the planner to pick them up.
+TRIGRAM_FIELDS = ["name", "description", "event_type"]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # SQLite cannot index LIKE '%...%', icontains keeps a table scan there.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for field in TRIGRAM_FIELDS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS event_{field}_trgm_idx ON events_event "
+            f"USING gin ((UPPER({field}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in TRIGRAM_FIELDS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS event_{field}_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["active", "start_date"], name="event_active_start_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                condition=models.Q(("active", True)),
+                fields=["start_date"],
+                name="event_upcoming_start_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["end_date"], name="event_end_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["start_date", "id"], name="event_start_date_id_idx"
+            ),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
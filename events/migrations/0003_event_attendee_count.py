@@ -0,0 +1,33 @@
+# Generated by Django 4.1.7 on 2026-10-18 14:54
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_attendee_count(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    Attendee = Event.list_of_attendees.through
+    counts = (
+        Attendee.objects.filter(event_id=OuterRef("pk"))
+        .values("event_id")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    Event.objects.update(attendee_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_event_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="attendee_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_attendee_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_event_attendee_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="attendees_updated_date",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
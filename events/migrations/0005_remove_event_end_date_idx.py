@@ -0,0 +1,17 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_event_attendees_updated_date"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="event",
+            name="event_end_date_idx",
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:40
+
+from django.db import migrations
+
+# The column is not on the model, events.search reads it with raw SQL. The trigger
+# fills it on every insert and on updates of name or description, bulk_create included.
+CREATE_SEARCH_VECTOR = [
+    "ALTER TABLE events_event ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION events_event_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER events_event_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON events_event
+    FOR EACH ROW EXECUTE FUNCTION events_event_search_vector_update()
+    """,
+    # Fires the trigger for the existing rows
+    "UPDATE events_event SET name = name",
+    "CREATE INDEX event_search_vector_idx ON events_event USING gin (search_vector)",
+]
+
+DROP_SEARCH_VECTOR = [
+    "DROP TRIGGER IF EXISTS events_event_search_vector_trigger ON events_event",
+    "DROP FUNCTION IF EXISTS events_event_search_vector_update()",
+    "ALTER TABLE events_event DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def create_search_vector(apps, schema_editor):
+    # SQLite gets an FTS5 table instead, see events.search.install_sqlite_search
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in CREATE_SEARCH_VECTOR:
+        schema_editor.execute(statement)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in DROP_SEARCH_VECTOR:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_remove_event_end_date_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
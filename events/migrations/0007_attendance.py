@@ -0,0 +1,121 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Django cannot add through= to an existing m2m field. The rows are copied into
+# Attendance, then the field is removed, dropping the implicit table, and added
+# back with through=Attendance, which creates no table.
+
+
+def copy_attendees(apps, schema_editor, reverse=False):
+    Event = apps.get_model("events", "Event")
+    Attendance = apps.get_model("events", "Attendance")
+    field = Event._meta.get_field("list_of_attendees")
+    quote = schema_editor.quote_name
+
+    implicit = quote(field.remote_field.through._meta.db_table)
+    event_column = quote(field.m2m_column_name())
+    user_column = quote(field.m2m_reverse_name())
+    attendance = quote(Attendance._meta.db_table)
+    if reverse:
+        schema_editor.execute(
+            f"INSERT INTO {implicit} ({event_column}, {user_column}) "
+            f"SELECT event_id, user_id FROM {attendance}"
+        )
+        return
+
+    # The signup time was not recorded, the last attendance change of the event
+    # bounds it. Equal times page by user id, the previous attendee order.
+    event_table = quote(Event._meta.db_table)
+    schema_editor.execute(
+        f"INSERT INTO {attendance} (event_id, user_id, subscribed_at) "
+        f"SELECT a.{event_column}, a.{user_column}, "
+        f"COALESCE(e.attendees_updated_date, e.created_date) "
+        f"FROM {implicit} a INNER JOIN {event_table} e ON e.id = a.{event_column}"
+    )
+
+
+def uncopy_attendees(apps, schema_editor):
+    copy_attendees(apps, schema_editor, reverse=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("events", "0006_event_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Attendance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "subscribed_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendances",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendances",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("event", "user"), name="attendance_event_user_unique"
+                    )
+                ],
+                "indexes": [
+                    models.Index(
+                        fields=["event", "subscribed_at", "user"],
+                        name="attendance_event_signup_idx",
+                    ),
+                    models.Index(
+                        fields=["user", "subscribed_at", "event"],
+                        name="attendance_user_history_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(copy_attendees, uncopy_attendees),
+        migrations.RemoveField(
+            model_name="event",
+            name="list_of_attendees",
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="list_of_attendees",
+            field=models.ManyToManyField(
+                default=None,
+                related_name="attendees",
+                through="events.Attendance",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
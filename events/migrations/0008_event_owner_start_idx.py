@@ -0,0 +1,34 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("events", "0007_attendance"),
+    ]
+
+    # The composite index is built before the owner index goes, so owner lookups
+    # stay indexed throughout
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["owner", "start_date", "id"], name="event_owner_start_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="event",
+            name="owner",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="owner",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("events", "0009_waitlistentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubscriptionTicket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("status", models.CharField(default="pending", max_length=20)),
+                ("created_date", models.DateTimeField(auto_now_add=True)),
+                ("processed_date", models.DateTimeField(null=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="subscription_tickets",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="subscription_tickets",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="subscriptionticket",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["id"],
+                name="ticket_pending_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="subscriptionticket",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "pending")),
+                fields=("event", "user"),
+                name="ticket_pending_event_user_unique",
+            ),
+        ),
+    ]
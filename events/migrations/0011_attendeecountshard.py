@@ -0,0 +1,53 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0010_subscriptionticket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AttendeeCountShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("slot", models.PositiveSmallIntegerField()),
+                ("capacity", models.PositiveIntegerField(default=0)),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="count_shards",
+                        to="events.event",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="attendeecountshard",
+            constraint=models.UniqueConstraint(
+                fields=("event", "slot"), name="shard_event_slot_unique"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="attendeecountshard",
+            constraint=models.CheckConstraint(
+                check=models.Q(("count__lte", models.F("capacity"))),
+                name="shard_count_lte_capacity",
+            ),
+        ),
+    ]
@@ -1,41 +1,228 @@
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db.models import Q
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
+from events_manager import routers
+
+from . import cache as event_cache
+from . import counters
+from .models import EventStatus
+from .search import search
+from .serializers import EventListValuesSerializer
+
 
 class QuerysetFilterMixin:
     """
     Mixin for queryset with filters provided by params.
+    Params are checked against `filter_lookups` and combined into a single query,
+    so a filtered list costs one round trip and an unmatched filter gives an empty page.
+    `q` is a full-text search, see events/search.py.
     """
 
+    filter_lookups = {
+        "id": "exact",
+        "owner": "exact",
+        "name": "icontains",
+        "description": "icontains",
+        "event_type": "icontains",
+    }
+    ignored_params = ("cursor", "page_size", "format")
+
     def filter_queryset(self, queryset):
-        search_params = self.request.query_params.dict()
+        query = Q()
+        for key, value in self.request.query_params.items():
+            if key in self.ignored_params:
+                continue
+            if key == "q":
+                queryset = search(queryset, value)
+            elif key == "status":
+                query &= self.get_status_filter(value)
+            elif key in self.filter_lookups:
+                query &= self.get_field_filter(queryset.model, key, value)
+            else:
+                raise ValidationError({"error": f"Invalid filter parameter '{key}'"})
 
-        if search_params:
-            query = Q()
+        return queryset.filter(query)
+
+    def get_status_filter(self, value):
+        """Filters on the condition behind the status_code annotation, which indexes serve"""
+        try:
+            status = EventStatus(value)
+        except ValueError:
+            raise ValidationError({"error": "Invalid value for 'status' parameter"})
+        return status.condition(timezone.now())
+
+    def get_field_filter(self, model, key, value):
+        lookup = self.filter_lookups[key]
+        if lookup == "exact":
             try:
-                for key, value in search_params.items():
-                    if key == "status":
-                        if value == "past":
-                            queryset = queryset.filter(end_date__lt=timezone.now())
-                        elif value == "future":
-                            queryset = queryset.filter(start_date__gt=timezone.now())
-                        elif value == "cancelled":
-                            queryset = queryset.filter(active=False)
-                        else:
-                            raise ValueError("Invalid value for 'search' parameter")
-                    else:
-                        field_lookup = f"{key}__icontains"
-                        if not queryset.filter(**{field_lookup: value}).exists():
-                            raise ValueError(
-                                f"No events found with {key} containing {value}"
-                            )
-                        query &= Q(**{field_lookup: value})
-            except ValueError as e:
-                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
-            if query:
-                queryset = queryset.filter(query)
-
-        return queryset
+                value = model._meta.get_field(key).to_python(value)
+            except DjangoValidationError:
+                raise ValidationError({"error": f"Invalid value for '{key}' parameter"})
+        return Q(**{f"{key}__{lookup}": value})
+
+
+class EventValuesPageMixin:
+    """
+    Mixin serializing event list pages from values() rows with EventListValuesSerializer.
+    The API schema documents the view's serializer_class, which has the same fields.
+    """
+
+    def paginate_queryset(self, queryset):
+        # Annotated for the page only, not for every event the filters match
+        return super().paginate_queryset(EventListValuesSerializer.get_rows(queryset))
+
+    def get_serializer_class(self):
+        if self.request.method == "GET" and not getattr(
+            self, "swagger_fake_view", False
+        ):
+            return EventListValuesSerializer
+        return super().get_serializer_class()
+
+
+class CachedResponseMixin:
+    """
+    Mixin serving GET responses from the event response cache, see events/cache.py.
+    Responses carry an X-Cache header telling whether they were a HIT or a MISS.
+    """
+
+    def get_cache_version_keys(self):
+        if "pk" in self.kwargs:
+            return [event_cache.detail_version_key(self.kwargs["pk"])]
+        return [event_cache.LIST_VERSION_KEY]
+
+    def get(self, request, *args, **kwargs):
+        version_keys = self.get_cache_version_keys()
+        key = event_cache.response_key(request, version_keys)
+        cached = event_cache.get_response(key)
+        if cached is not None:
+            # Validators are cached with the data, a HIT never reaches the database.
+            response = get_conditional_response(
+                request,
+                etag=cached["etag"],
+                last_modified=parse_http_date_safe(cached["last_modified"]),
+            )
+            if response is None:
+                response = Response(cached["data"])
+            if cached["etag"]:
+                response["ETag"] = cached["etag"]
+            if cached["last_modified"]:
+                response["Last-Modified"] = cached["last_modified"]
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        # A lagging replica would pin rows older than the versions for the timeout
+        stale = routers.reads_from_replica() and event_cache.written_recently(
+            version_keys
+        )
+        if response.status_code == status.HTTP_200_OK and not stale:
+            cached = {
+                "data": response.data,
+                "etag": response.get("ETag"),
+                "last_modified": response.get("Last-Modified"),
+            }
+            event_cache.set_response(key, cached)
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Mixin adding ETag and Last-Modified to GET responses and answering conditional
+    GETs with 304 before anything is serialized.
+    The detail validators come from updated_date and attendees_updated_date of the
+    event. Subscribes through counter shards move neither date until compaction, the
+    detail ETag then adds the cache version of the event and has no Last-Modified.
+    The list validators come from the list cache version, which every event write
+    bumps, and the time of its last bump, along with the query and its cursor.
+    Statuses move with the clock, the list is modified again every EVENTS_CACHE_TIMEOUT
+    as long as cached list pages live.
+    Versions only tell other processes about a write through a shared cache, without
+    EVENTS_CACHE_SHARED the list and sharded details have no validators.
+    """
+
+    def get_object(self):
+        # The detail validators load the event, retrieve() reuses it.
+        if not hasattr(self, "_object"):
+            self._object = super().get_object()
+        return self._object
+
+    def get_validator_values(self):
+        """The values the validators come from, None when there can be none"""
+        now = timezone.now()
+        if "pk" in self.kwargs:
+            event = self.get_object()
+            values = {
+                "updated_date": event.updated_date,
+                "attendees_updated_date": event.attendees_updated_date,
+                "attendee_count": event.attendee_count,
+                # status changes once the event has started
+                "started_date": event.start_date if event.start_date <= now else None,
+            }
+            if counters.enabled():
+                if not settings.EVENTS_CACHE_SHARED:
+                    return None
+                (values["version"],) = event_cache.get_versions(
+                    event_cache.detail_version_key(event.pk)
+                )
+            return values
+
+        if not settings.EVENTS_CACHE_SHARED:
+            return None
+        version, modified = event_cache.get_versions(
+            event_cache.LIST_VERSION_KEY, event_cache.LIST_MODIFIED_KEY
+        )
+        timeout = settings.EVENTS_CACHE_TIMEOUT
+        period_start = int(now.timestamp()) // timeout * timeout
+        return {
+            "version": version,
+            "last_modified": max(modified // 10**9, period_start),
+        }
+
+    def get_validators(self):
+        values = self.get_validator_values()
+        if values is None:
+            return None, None
+        query = sorted(
+            (key, sorted(value)) for key, value in self.request.query_params.lists()
+        )
+        raw_etag = f"{self.request.get_host()}{self.request.path}|{query}|{values}"
+        etag = '"%s"' % hashlib.sha256(raw_etag.encode()).hexdigest()
+
+        if "last_modified" in values:
+            last_modified = values["last_modified"]
+        elif "version" in values:
+            # A sharded subscribe moves the version only
+            last_modified = None
+        else:
+            dates = [
+                values[name]
+                for name in ("updated_date", "attendees_updated_date", "started_date")
+                if values[name] is not None
+            ]
+            last_modified = int(max(dates).timestamp())
+        return etag, last_modified
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return super().get(request, *args, **kwargs)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        response.headers.setdefault("ETag", etag)
+        if last_modified:
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+        return response
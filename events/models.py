@@ -5,9 +5,45 @@ from django.utils import timezone
 User = get_user_model()
 
 
+class EventStatus(models.TextChoices):
+    """
+    Status of an event at a given time. A cancelled event is neither past nor
+    future, an active event is past from its start date on.
+    """
+
+    PAST = "past"
+    FUTURE = "future"
+    CANCELLED = "cancelled"
+
+    def condition(self, now):
+        if self == EventStatus.CANCELLED:
+            return models.Q(active=False)
+        if self == EventStatus.FUTURE:
+            return models.Q(active=True, start_date__gt=now)
+        return models.Q(active=True, start_date__lte=now)
+
+
+class EventQuerySet(models.QuerySet):
+    def with_status(self, now=None):
+        """Annotates status_code, computed by the database against one `now` for every row"""
+        now = now or timezone.now()
+        return self.annotate(
+            status_code=models.Case(
+                *(
+                    models.When(status.condition(now), then=models.Value(status.value))
+                    for status in EventStatus
+                ),
+                output_field=models.CharField(),
+            )
+        )
+
+
 class Event(models.Model):
     name = models.CharField(max_length=50)
-    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="owner")
+    # event_owner_start_idx starts with the owner, it serves the foreign key too
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_index=False, related_name="owner"
+    )
     description = models.TextField()
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
@@ -15,25 +51,215 @@ class Event(models.Model):
     active = models.BooleanField(default=True)
     maximum_attendees = models.IntegerField(default=50)
     list_of_attendees = models.ManyToManyField(
-        User, default=None, related_name="attendees"
+        User, through="Attendance", default=None, related_name="attendees"
     )
+    # Denormalized size of list_of_attendees, maintained by events.subscriptions
+    # and the m2m_changed handler in events.signals
+    attendee_count = models.PositiveIntegerField(default=0, editable=False)
+    # Last change of list_of_attendees, which does not touch updated_date
+    attendees_updated_date = models.DateTimeField(null=True, editable=False)
     created_date = models.DateTimeField(auto_now_add=True, editable=False)
     updated_date = models.DateTimeField(auto_now=True)
 
+    objects = EventQuerySet.as_manager()
+
+    _status_code = None
+
+    @property
+    def status_code(self):
+        """One of EventStatus, annotated by EventQuerySet.with_status or computed here"""
+        if self._status_code is not None:
+            return self._status_code
+        if not self.active:
+            return EventStatus.CANCELLED.value
+        if self.start_date > timezone.now():
+            return EventStatus.FUTURE.value
+        return EventStatus.PAST.value
+
+    @status_code.setter
+    def status_code(self, value):
+        self._status_code = value
+
     @property
     def status(self):
         """Returns the status of events
         inactive = cancelled, active+future date = happening at xyz, active+past date = held on
         """
-        if self.active:
-            if self.start_date > timezone.now():
-                return f"Happening at {self.start_date}"
-            return f"Held on {self.start_date}"
+        return self.format_status(self.status_code, self.start_date)
+
+    @staticmethod
+    def format_status(status_code, start_date):
+        """The displayed status, also used for rows fetched with values()"""
+        if status_code == EventStatus.FUTURE:
+            return f"Happening at {start_date}"
+        if status_code == EventStatus.PAST:
+            return f"Held on {start_date}"
         return "Cancelled"
 
     @property
     def number_of_attendees(self):
-        return self.list_of_attendees.count()
+        return self.attendee_count
+
+    class Meta:
+        indexes = [
+            # Every status filter, see EventStatus.condition
+            models.Index(
+                fields=["active", "start_date"], name="event_active_start_idx"
+            ),
+            # Only the events still listed as happening, kept small by the condition
+            models.Index(
+                fields=["start_date"],
+                condition=models.Q(active=True),
+                name="event_upcoming_start_idx",
+            ),
+            # Keyset pagination order, see events/pagination.py
+            models.Index(fields=["start_date", "id"], name="event_start_date_id_idx"),
+            # Events of an owner in keyset pagination order, see events.views.OwnedEventsView
+            models.Index(
+                fields=["owner", "start_date", "id"], name="event_owner_start_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class Attendance(models.Model):
+    """
+    Membership of a user in Event.list_of_attendees. Its indexes lead with the event
+    or the user and carry subscribed_at and the other key, so attendees of an event
+    in signup order and events of a user by date are both index range scans.
+    """
+
+    # The composite indexes below start with each key, they serve the foreign keys too
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, db_index=False, related_name="attendances"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_index=False, related_name="attendances"
+    )
+    subscribed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "user"], name="attendance_event_user_unique"
+            ),
+        ]
+        indexes = [
+            # Attendees of an event in signup order, see events.views.EventAttendeesView
+            models.Index(
+                fields=["event", "subscribed_at", "user"],
+                name="attendance_event_signup_idx",
+            ),
+            # Events of a user by subscription date
+            models.Index(
+                fields=["user", "subscribed_at", "event"],
+                name="attendance_user_history_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} attends {self.event_id}"
+
+
+class WaitlistEntry(models.Model):
+    """
+    A user waiting for a seat at a full event. Entries are promoted to attendees
+    first come, first served, see events.subscriptions.
+    """
+
+    # waitlist_event_order_idx starts with the event, it serves the foreign key too
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, db_index=False, related_name="waitlist"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="waitlist_entries"
+    )
+    created_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "user"], name="waitlist_event_user_unique"
+            ),
+        ]
+        indexes = [
+            # Head of the queue of an event, see events.subscriptions.promote_waitlist
+            models.Index(
+                fields=["event", "created_date", "id"], name="waitlist_event_order_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} waits for {self.event_id}"
+
+
+class SubscriptionTicket(models.Model):
+    """
+    A subscribe request queued in admission mode, see events.tickets. It is pending
+    until a worker decides it, then status holds the outcome of the subscribe.
+    """
+
+    PENDING = "pending"
+    CANCELLED = "cancelled"
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="subscription_tickets"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="subscription_tickets"
+    )
+    status = models.CharField(max_length=20, default=PENDING)
+    created_date = models.DateTimeField(auto_now_add=True)
+    processed_date = models.DateTimeField(null=True)
+
+    class Meta:
+        constraints = [
+            # A repeated request gets the ticket already queued
+            models.UniqueConstraint(
+                fields=["event", "user"],
+                condition=models.Q(status="pending"),
+                name="ticket_pending_event_user_unique",
+            ),
+        ]
+        indexes = [
+            # The queue in arrival order, kept small by the condition
+            models.Index(
+                fields=["id"],
+                condition=models.Q(status="pending"),
+                name="ticket_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Ticket {self.pk}: {self.user_id} for {self.event_id}, {self.status}"
+
+
+class AttendeeCountShard(models.Model):
+    """
+    A share of the free seats of an event and the seats taken from it since the
+    last compaction, see events.counters.
+    """
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, db_index=False, related_name="count_shards"
+    )
+    slot = models.PositiveSmallIntegerField()
+    capacity = models.PositiveIntegerField(default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index of the lookups by event
+            models.UniqueConstraint(
+                fields=["event", "slot"], name="shard_event_slot_unique"
+            ),
+            models.CheckConstraint(
+                check=models.Q(count__lte=models.F("capacity")),
+                name="shard_count_lte_capacity",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id}/{self.slot}: {self.count} of {self.capacity}"
@@ -0,0 +1,162 @@
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on the full ordering tuple instead of an offset.
+
+    DRF's CursorPagination positions on the first ordering field only and falls
+    back to an offset for ties. Here the cursor carries the value of every
+    ordering field of the boundary row, so each page is a single indexed range
+    query whatever its depth. The last ordering field must be unique.
+    """
+
+    page_size = settings.EVENTS_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.EVENTS_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page(list(page_queryset))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        The unevaluated query of the page, plus one row telling whether a following
+        page exists. Async views fetch it themselves and hand the rows to set_page.
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = self.cursor.reverse, self.cursor.position
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self._get_keyset_filter(queryset, ordering, position)
+            )
+
+        # Fetch one extra row to find out whether a following page exists.
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        """Take the rows of get_page_queryset and return the page"""
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = self.cursor.reverse, self.cursor.position
+
+        self.page = results[: self.page_size]
+        has_following = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = position is not None
+
+        if self.page:
+            self.previous_position = self._get_position_from_instance(
+                self.page[0], self.ordering
+            )
+            self.next_position = self._get_position_from_instance(
+                self.page[-1], self.ordering
+            )
+        else:
+            self.previous_position = self.next_position = position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        cursor = Cursor(offset=0, reverse=False, position=self.next_position)
+        return self.encode_cursor(cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        cursor = Cursor(offset=0, reverse=True, position=self.previous_position)
+        return self.encode_cursor(cursor)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip("-")
+            if isinstance(instance, dict):
+                values.append(instance[field_name])
+            else:
+                values.append(getattr(instance, field_name))
+        return json.dumps([str(value) for value in values])
+
+    def _get_keyset_filter(self, queryset, ordering, position):
+        """
+        Build the row-value comparison (a, b) > (x, y) as
+        a > x OR (a = x AND b > y), honouring the direction of each field.
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        keyset = Q()
+        equal = Q()
+        for order, value in zip(ordering, values):
+            field_name = order.lstrip("-")
+            value = self._to_python(queryset, field_name, value)
+            lookup = "lt" if order.startswith("-") else "gt"
+            keyset |= equal & Q(**{f"{field_name}__{lookup}": value})
+            equal &= Q(**{field_name: value})
+        return keyset
+
+    def _to_python(self, queryset, field_name, value):
+        if field_name in queryset.query.annotations:
+            field = queryset.query.annotations[field_name].output_field
+        else:
+            try:
+                field = queryset.model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                raise NotFound(self.invalid_cursor_message)
+        try:
+            return field.to_python(value)
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+
+class EventCursorPagination(KeysetCursorPagination):
+    ordering = ("start_date", "id")
+    # Search results come best match first, see events/search.py
+    search_ordering = ("-rank", "id")
+
+    def get_ordering(self, request, queryset, view):
+        if "rank" in queryset.query.annotations:
+            return self.search_ordering
+        return self.ordering
+
+
+class AttendeeCursorPagination(KeysetCursorPagination):
+    # Signup order, see Attendance.Meta.indexes
+    ordering = ("subscribed_at", "user_id")
@@ -5,4 +5,10 @@ class IsOwnerOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in ["GET", "HEAD", "OPTIONS"]:
             return True
-        return obj.owner == request.user
+        # Compare ids, request.user may be a users.authentication.ClaimsUser
+        return obj.owner_id == request.user.id
+
+
+class IsOwnerOrAdmin(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return request.user.is_staff or obj.owner_id == request.user.id
@@ -0,0 +1,129 @@
+"""
+Ranked full-text search over event name and description, see `?q=` on the event list.
+
+PostgreSQL matches against events_event.search_vector, a tsvector column filled by a
+trigger and GIN indexed, see migration 0006. SQLite matches against the FTS5 table
+events_event_fts, kept in sync by triggers installed after every migrate: SQLite
+rebuilds a table to alter it, which drops its triggers. Both go again once events is
+migrated to zero. Neither lives on the model, so list queries never load them.
+
+A name match ranks above a description match on both backends, and both stem
+English words, "wines" finds "wine".
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ValidationError
+
+from .models import Event
+
+# Must match the configuration used by the trigger of migration 0006
+SEARCH_CONFIG = "english"
+
+FTS_TABLE = "events_event_fts"
+
+SQLITE_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, content='events_event', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON events_event
+    BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON events_event
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF name, description ON events_event
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+
+SQLITE_DROP_SCHEMA = [
+    *(
+        f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{name}"
+        for name in ("insert", "delete", "update")
+    ),
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def install_sqlite_search(sender, using, **kwargs):
+    """
+    post_migrate receiver creating the FTS5 table and triggers where missing, or
+    dropping them when events_event is gone: post_migrate is sent for every app,
+    after a migrate of another app alone or of events to zero too.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        if Event._meta.db_table not in connection.introspection.table_names(cursor):
+            for statement in SQLITE_DROP_SCHEMA:
+                cursor.execute(statement)
+            return
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+            [f"{FTS_TABLE}_%"],
+        )
+        (installed,) = cursor.fetchone()
+        for statement in SQLITE_SCHEMA:
+            cursor.execute(statement)
+        # rank is bm25 with the name weighted twice the description, lower is better
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(2.0, 1.0)')"
+        )
+        if installed < len(SQLITE_SCHEMA) - 1:
+            # Rows written without the triggers are indexed again
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def search(queryset, text):
+    """
+    Restrict the queryset to events matching every word of text, annotated with
+    rank, higher for a better match.
+    """
+    words = text.split()
+    if not words:
+        raise ValidationError({"error": "Invalid value for 'q' parameter"})
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        table = Event._meta.db_table
+        vector = RawSQL(
+            f'"{table}"."search_vector"', [], output_field=SearchVectorField()
+        )
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            queryset.alias(search_vector=vector)
+            .filter(search_vector=query)
+            .annotate(rank=SearchRank(vector, query))
+        )
+
+    if vendor == "sqlite":
+        # Every word as a quoted FTS5 string, joined by the implicit AND
+        match = " ".join('"%s"' % word.replace('"', '""') for word in words)
+        # The ORM cannot join a table without a model, extra() joins the FTS5 table
+        # so its rank column is read in the same pass as the match.
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = events_event.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+        ).annotate(rank=RawSQL(f"-{FTS_TABLE}.rank", [], output_field=FloatField()))
+
+    # No full-text index, every word has to appear in name or description
+    query = Q()
+    for word in words:
+        query &= Q(name__icontains=word) | Q(description__icontains=word)
+    return queryset.filter(query).annotate(rank=Value(0.0, output_field=FloatField()))
@@ -1,7 +1,30 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
 
-from .models import Event
+from . import cache as event_cache
+from . import subscriptions
+from .models import Attendance, Event, SubscriptionTicket
+
+User = get_user_model()
+
+
+class EventBulkCreateSerializer(serializers.ListSerializer):
+    """Creates the validated events with batched INSERTs in one transaction"""
+
+    def create(self, validated_data):
+        owner_id = self.context["request"].user.pk
+        events = [Event(owner_id=owner_id, **item) for item in validated_data]
+        with transaction.atomic():
+            events = Event.objects.bulk_create(
+                events, batch_size=settings.EVENTS_BULK_BATCH_SIZE
+            )
+        # bulk_create sends no post_save signal
+        event_cache.invalidate_list()
+        return events
 
 
 class EventListCreateSerializer(serializers.ModelSerializer):
@@ -10,6 +33,7 @@ class EventListCreateSerializer(serializers.ModelSerializer):
     created_date = serializers.ReadOnlyField()
     updated_date = serializers.ReadOnlyField()
     status = serializers.ReadOnlyField()
+    status_code = serializers.ReadOnlyField()
     number_of_attendees = serializers.ReadOnlyField()
 
     def validate(self, data):
@@ -36,12 +60,13 @@ class EventListCreateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         user = self.context["request"].user
-        validated_data["owner"] = user
+        validated_data["owner_id"] = user.pk
         instance = super().create(validated_data)
         return instance
 
     class Meta:
         model = Event
+        list_serializer_class = EventBulkCreateSerializer
         fields = [
             "id",
             "name",
@@ -53,11 +78,85 @@ class EventListCreateSerializer(serializers.ModelSerializer):
             "created_date",
             "updated_date",
             "status",
+            "status_code",
             "number_of_attendees",
             "maximum_attendees",
         ]
 
 
+class EventListValuesSerializer:
+    """
+    Read-only EventListCreateSerializer for rows of values(*EventListValuesSerializer.values),
+    with the same fields and output. It builds each dict directly instead of going
+    through a DRF field per value, which dominates the cost of large pages.
+    """
+
+    fields = EventListCreateSerializer.Meta.fields
+    # Columns behind fields, status is derived from status_code and start_date
+    values = [
+        "id",
+        "name",
+        "owner",
+        "description",
+        "start_date",
+        "end_date",
+        "event_type",
+        "created_date",
+        "updated_date",
+        "status_code",
+        "attendee_count",
+        "maximum_attendees",
+    ]
+
+    def __init__(self, instance, many=False, context=None):
+        self.instance = instance
+        self.many = many
+        self.timezone = timezone.get_current_timezone()
+        # Database datetimes are in UTC already, most responses need no conversion
+        self.convert = timezone.get_current_timezone_name() != "UTC"
+
+    @classmethod
+    def get_rows(cls, queryset):
+        """The values() queryset to serialize, keeping the search rank for the cursor"""
+        queryset = queryset.with_status()
+        if "rank" in queryset.query.annotations:
+            return queryset.values(*cls.values, "rank")
+        return queryset.values(*cls.values)
+
+    @property
+    def data(self):
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
+
+    def to_representation(self, row):
+        start_date = row["start_date"]
+        # As serializers.DateTimeField, the other dates are ReadOnlyFields
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "owner": row["owner"],
+            "description": row["description"],
+            "start_date": self.format_datetime(start_date),
+            "end_date": self.format_datetime(row["end_date"]),
+            "event_type": row["event_type"],
+            "created_date": row["created_date"],
+            "updated_date": row["updated_date"],
+            "status": Event.format_status(row["status_code"], start_date),
+            "status_code": row["status_code"],
+            "number_of_attendees": row["attendee_count"],
+            "maximum_attendees": row["maximum_attendees"],
+        }
+
+    def format_datetime(self, value):
+        if self.convert:
+            value = value.astimezone(self.timezone)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+
 class EventDetailUpdateSerializer(serializers.ModelSerializer):
     id = serializers.ReadOnlyField()
     owner = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -67,6 +166,7 @@ class EventDetailUpdateSerializer(serializers.ModelSerializer):
     created_date = serializers.ReadOnlyField()
     updated_date = serializers.ReadOnlyField()
     status = serializers.ReadOnlyField()
+    status_code = serializers.ReadOnlyField()
 
     def validate(self, data):
         """
@@ -101,6 +201,28 @@ class EventDetailUpdateSerializer(serializers.ModelSerializer):
 
         return data
 
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        with transaction.atomic():
+            # Only the edited columns: the attendee counter of the loaded instance
+            # is stale once a subscribe ran since, a full save would undo it.
+            instance.save(update_fields=[*validated_data, "updated_date"])
+            if "maximum_attendees" in validated_data:
+                # Seats added to a full event go to its waitlist
+                subscriptions.promote_waitlist(instance.pk)
+                instance.refresh_from_db(
+                    fields=["attendee_count", "attendees_updated_date"]
+                )
+        return instance
+
+    def get_fields(self):
+        """list_of_attendees grows with the event, it is only included with expand=attendees"""
+        fields = super().get_fields()
+        if "attendees" not in self.context.get("expand", ()):
+            fields.pop("list_of_attendees")
+        return fields
+
     class Meta:
         model = Event
         fields = [
@@ -116,11 +238,20 @@ class EventDetailUpdateSerializer(serializers.ModelSerializer):
             "created_date",
             "updated_date",
             "status",
+            "status_code",
             "number_of_attendees",
             "active",
         ]
 
 
+class EventAttendeeSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="user_id", read_only=True)
+
+    class Meta:
+        model = Attendance
+        fields = ["id", "subscribed_at"]
+
+
 class EventSubscribeSerializer(serializers.Serializer):
 
     def update(self, instance, validated_data):
@@ -128,23 +259,71 @@ class EventSubscribeSerializer(serializers.Serializer):
         request_path = self.context["request"].path
 
         if "/subscribe" in request_path:
-            if instance.number_of_attendees == instance.maximum_attendees:
+            outcome = subscriptions.subscribe(instance.pk, user.pk)
+            if outcome == subscriptions.NOT_FOUND:
+                # Deleted since the view loaded it
+                raise NotFound()
+            if outcome == subscriptions.ALREADY_SUBSCRIBED:
+                raise serializers.ValidationError({"message": "Already Subscribed"})
+            if outcome == subscriptions.ALREADY_WAITLISTED:
                 raise serializers.ValidationError(
-                    {"message": "Maximum number of attendees reached for this event."}
+                    {"message": "Already on the waitlist"}
                 )
-            if user not in instance.list_of_attendees.all():
-                instance.list_of_attendees.add(user)
-                message = "Subscribed to the event"
+            if outcome == subscriptions.WAITLISTED:
+                message = "Event is full, added to the waitlist"
             else:
-                raise serializers.ValidationError({"message": "Already Subscribed"})
+                message = "Subscribed to the event"
         elif "/unsubscribe" in request_path:
-            if user in instance.list_of_attendees.all():
-                instance.list_of_attendees.remove(user)
-                message = "Unsubscribed from the event"
-                success = True
-
-            else:
+            outcome = subscriptions.unsubscribe(instance.pk, user.pk)
+            if outcome == subscriptions.NOT_SUBSCRIBED:
                 raise serializers.ValidationError({"message": "Already Unsubscribed"})
+            if outcome == subscriptions.LEFT_WAITLIST:
+                message = "Removed from the waitlist"
+            else:
+                message = "Unsubscribed from the event"
 
-        instance.save()
         return message
+
+
+class EventBulkSubscribeSerializer(serializers.Serializer):
+    """Subscribes the listed users to the event, results are reported per user"""
+
+    users = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.EVENTS_BULK_MAX_SIZE,
+    )
+
+    def update(self, instance, validated_data):
+        outcomes = subscriptions.subscribe_users(instance.pk, validated_data["users"])
+        return [
+            {"user": user_id, "result": outcome}
+            for user_id, outcome in outcomes.items()
+        ]
+
+
+class EventsBulkSubscribeSerializer(serializers.Serializer):
+    """Subscribes the request user to the listed events, results are reported per event"""
+
+    events = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.EVENTS_BULK_MAX_SIZE,
+    )
+
+    def create(self, validated_data):
+        user = self.context["request"].user
+        outcomes = subscriptions.subscribe_to_events(user.pk, validated_data["events"])
+        return [
+            {"event": event_id, "result": outcome}
+            for event_id, outcome in outcomes.items()
+        ]
+
+
+class SubscriptionTicketSerializer(serializers.ModelSerializer):
+    """A queued subscribe, status is pending until decided, then its outcome"""
+
+    class Meta:
+        model = SubscriptionTicket
+        fields = ["id", "event", "status", "created_date", "processed_date"]
+        read_only_fields = fields
@@ -0,0 +1,56 @@
+from contextlib import ExitStack
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache as event_cache
+from . import counters
+from .models import Event
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_cache(sender, instance, **kwargs):
+    event_cache.invalidate_event(instance.pk)
+
+
+@receiver(m2m_changed, sender=Event.list_of_attendees.through)
+def update_attendee_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep Event.attendee_count in sync when list_of_attendees goes through the ORM"""
+    if reverse and action == "pre_clear":
+        instance._cleared_event_ids = list(
+            instance.attendees.values_list("pk", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        event_ids = [instance.pk]
+    elif action == "post_clear":
+        event_ids = instance.__dict__.pop("_cleared_event_ids", [])
+    else:
+        event_ids = pk_set
+
+    counts = (
+        sender.objects.filter(event_id=OuterRef("pk"))
+        .values("event_id")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    with transaction.atomic(), ExitStack() as stack:
+        # The recount already holds the seats taken from the shards
+        for event_id in sorted(event_ids):
+            stack.enter_context(counters.folded(event_id))
+        Event.objects.filter(pk__in=event_ids).update(
+            attendee_count=Coalesce(Subquery(counts), 0),
+            attendees_updated_date=timezone.now(),
+        )
+    for event_id in event_ids:
+        event_cache.invalidate_event(event_id)
+    if not reverse:
+        instance.refresh_from_db(fields=["attendee_count", "attendees_updated_date"])
@@ -0,0 +1,332 @@
+"""
+Writes to event attendance and to the event waitlists.
+
+Every path takes the event row lock (a conditional UPDATE or SELECT ... FOR UPDATE)
+before it touches the attendee or waitlist rows of that event, so concurrent
+subscribes and unsubscribes serialize on the event and cannot deadlock each other.
+A seat released by an unsubscribe goes to the head of the waitlist in the same
+transaction, so the waitlist of an event is only ever non empty while it is full.
+
+With EVENTS_ATTENDEE_SHARDS, a subscribe takes its seat from a counter shard and
+leaves the event row alone, see events/counters.py. Every other path runs inside
+counters.folded, which takes the event row lock and then the shard locks, so the
+order above holds with the shards between the event row and the attendee rows.
+"""
+
+from contextlib import ExitStack
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import cache as event_cache
+from . import counters
+from .models import Attendance, Event, WaitlistEntry
+
+User = get_user_model()
+
+SUBSCRIBED = "subscribed"
+ALREADY_SUBSCRIBED = "already_subscribed"
+FULL = "full"
+WAITLISTED = "waitlisted"
+ALREADY_WAITLISTED = "already_waitlisted"
+NOT_FOUND = "not_found"
+UNSUBSCRIBED = "unsubscribed"
+LEFT_WAITLIST = "left_waitlist"
+NOT_SUBSCRIBED = "not_subscribed"
+
+
+def _reserve_seat(event_id):
+    return Event.objects.filter(
+        pk=event_id, attendee_count__lt=F("maximum_attendees")
+    ).update(
+        attendee_count=F("attendee_count") + 1,
+        attendees_updated_date=timezone.now(),
+    )
+
+
+def _take_seat(event_id):
+    if counters.enabled():
+        return counters.reserve(event_id)
+    return _reserve_seat(event_id)
+
+
+def subscribe(event_id, user_id):
+    """
+    Add the user to the event attendees, or to its waitlist when the event is full,
+    and return one of the outcomes above.
+
+    The capacity check and the attendee_count increment are one conditional UPDATE,
+    which the database serializes on the event row, so the count can never overshoot
+    maximum_attendees. The membership insert then relies on the (event, user) unique
+    constraint instead of a lookup. With sharded counters the UPDATE is on a shard.
+    """
+    with transaction.atomic():
+        if not _take_seat(event_id):
+            # Look again under the event row lock: a seat released since went to
+            # the waitlist, or is still free when the waitlist was empty.
+            with counters.folded(event_id):
+                event = (
+                    Event.objects.select_for_update(no_key=True)
+                    .only("attendee_count", "maximum_attendees")
+                    .filter(pk=event_id)
+                    .first()
+                )
+                if event is None:
+                    return NOT_FOUND
+                if event.attendee_count >= event.maximum_attendees:
+                    return _join_waitlist(event_id, user_id)
+                _reserve_seat(event_id)
+
+        try:
+            with transaction.atomic():
+                Attendance.objects.create(event_id=event_id, user_id=user_id)
+        except IntegrityError:
+            # Give the seat back on exit from the atomic block.
+            transaction.set_rollback(True)
+            return ALREADY_SUBSCRIBED
+
+    event_cache.invalidate_event(event_id)
+    return SUBSCRIBED
+
+
+def _join_waitlist(event_id, user_id):
+    """The end of subscribe for a full event, under its row lock"""
+    if Attendance.objects.filter(event_id=event_id, user_id=user_id).exists():
+        return ALREADY_SUBSCRIBED
+    try:
+        with transaction.atomic():
+            WaitlistEntry.objects.create(event_id=event_id, user_id=user_id)
+    except IntegrityError:
+        return ALREADY_WAITLISTED
+    return WAITLISTED
+
+
+def unsubscribe(event_id, user_id):
+    """
+    Remove the user from the event attendees, promoting the head of the waitlist to
+    the released seat, or from the waitlist. Returns one of the outcomes above.
+
+    The membership test is the DELETE itself, a lookup on the (event, user) unique
+    index, so the cost does not depend on how many attendees the event has.
+    """
+    with transaction.atomic(), counters.folded(event_id):
+        with transaction.atomic():
+            released = Event.objects.filter(pk=event_id, attendee_count__gt=0).update(
+                attendee_count=F("attendee_count") - 1,
+                attendees_updated_date=timezone.now(),
+            )
+            deleted = 0
+            if released:
+                deleted, _ = Attendance.objects.filter(
+                    event_id=event_id, user_id=user_id
+                ).delete()
+            if not deleted:
+                # Restore the count on exit from the savepoint.
+                transaction.set_rollback(True)
+
+        if not deleted:
+            left, _ = WaitlistEntry.objects.filter(
+                event_id=event_id, user_id=user_id
+            ).delete()
+            return LEFT_WAITLIST if left else NOT_SUBSCRIBED
+
+        _promote(event_id, 1)
+
+    event_cache.invalidate_event(event_id)
+    return UNSUBSCRIBED
+
+
+def promote_waitlist(event_id):
+    """
+    Give the free seats of the event to the head of its waitlist and return how many
+    users were promoted. For changes that add seats, such as a larger maximum_attendees.
+    """
+    with transaction.atomic(), counters.folded(event_id):
+        event = (
+            Event.objects.select_for_update(no_key=True)
+            .only("attendee_count", "maximum_attendees")
+            .filter(pk=event_id)
+            .first()
+        )
+        if event is None:
+            return 0
+        promoted = _promote(event_id, event.maximum_attendees - event.attendee_count)
+
+    if promoted:
+        event_cache.invalidate_event(event_id)
+    return promoted
+
+
+def _promote(event_id, seats):
+    """
+    Move up to `seats` users from the head of the waitlist to the attendees. Runs in
+    the caller's transaction, under its event row lock. Entries locked by users
+    leaving the waitlist are skipped instead of waited for.
+    """
+    promoted = 0
+    while promoted < seats:
+        entries = list(
+            WaitlistEntry.objects.select_for_update(skip_locked=True)
+            .filter(event_id=event_id)
+            .order_by("created_date", "id")
+            .values_list("pk", "user_id")[: seats - promoted]
+        )
+        if not entries:
+            break
+        entry_ids, user_ids = zip(*entries)
+        WaitlistEntry.objects.filter(pk__in=entry_ids).delete()
+        # Users added to the attendees some other way only leave the queue
+        attending = set(
+            Attendance.objects.filter(
+                event_id=event_id, user_id__in=user_ids
+            ).values_list("user_id", flat=True)
+        )
+        accepted = [user_id for user_id in user_ids if user_id not in attending]
+        Attendance.objects.bulk_create(
+            [Attendance(event_id=event_id, user_id=user_id) for user_id in accepted]
+        )
+        promoted += len(accepted)
+
+    if promoted:
+        Event.objects.filter(pk=event_id).update(
+            attendee_count=F("attendee_count") + promoted,
+            attendees_updated_date=timezone.now(),
+        )
+    return promoted
+
+
+def subscribe_users(event_id, user_ids, waitlist=False):
+    """
+    Subscribe many users to one event and return {user_id: outcome}.
+
+    The capacity check runs once under the event row lock, the accepted users are
+    inserted with one bulk INSERT and the counter moves with one UPDATE. Users get
+    the remaining seats in request order, with `waitlist` the others join the
+    waitlist in that order instead of being turned away as FULL.
+    Raises Event.DoesNotExist.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    with transaction.atomic(), counters.folded(event_id):
+        event = (
+            Event.objects.select_for_update(no_key=True)
+            .only("attendee_count", "maximum_attendees")
+            .get(pk=event_id)
+        )
+        known = set(User.objects.filter(pk__in=user_ids).values_list("pk", flat=True))
+        subscribed = set(
+            Attendance.objects.filter(
+                event_id=event_id, user_id__in=user_ids
+            ).values_list("user_id", flat=True)
+        )
+        waiting = set()
+        if waitlist:
+            waiting = set(
+                WaitlistEntry.objects.filter(
+                    event_id=event_id, user_id__in=user_ids
+                ).values_list("user_id", flat=True)
+            )
+        seats = max(event.maximum_attendees - event.attendee_count, 0)
+
+        outcomes = {}
+        accepted = []
+        queued = []
+        for user_id in user_ids:
+            if user_id not in known:
+                outcomes[user_id] = NOT_FOUND
+            elif user_id in subscribed:
+                outcomes[user_id] = ALREADY_SUBSCRIBED
+            elif user_id in waiting:
+                outcomes[user_id] = ALREADY_WAITLISTED
+            elif len(accepted) < seats:
+                accepted.append(user_id)
+                outcomes[user_id] = SUBSCRIBED
+            elif waitlist:
+                queued.append(user_id)
+                outcomes[user_id] = WAITLISTED
+            else:
+                outcomes[user_id] = FULL
+
+        if queued:
+            # Ids follow the list, they order entries created at the same time
+            WaitlistEntry.objects.bulk_create(
+                [
+                    WaitlistEntry(event_id=event_id, user_id=user_id)
+                    for user_id in queued
+                ]
+            )
+
+        if accepted:
+            Attendance.objects.bulk_create(
+                [
+                    Attendance(event_id=event_id, user_id=user_id)
+                    for user_id in accepted
+                ],
+                ignore_conflicts=True,
+            )
+            Event.objects.filter(pk=event_id).update(
+                attendee_count=F("attendee_count") + len(accepted),
+                attendees_updated_date=timezone.now(),
+            )
+
+    if accepted:
+        event_cache.invalidate_event(event_id)
+    return outcomes
+
+
+def subscribe_to_events(user_id, event_ids):
+    """
+    Subscribe one user to many events and return {event_id: outcome}.
+
+    The events are locked in id order, so two batches over overlapping events wait
+    for each other instead of deadlocking. Memberships are inserted with one bulk
+    INSERT and the counters move with one UPDATE.
+    """
+    event_ids = list(dict.fromkeys(event_ids))
+    with transaction.atomic(), ExitStack() as stack:
+        for event_id in sorted(event_ids):
+            stack.enter_context(counters.folded(event_id))
+        events = {
+            event.pk: event
+            for event in Event.objects.select_for_update(no_key=True)
+            .filter(pk__in=event_ids)
+            .order_by("pk")
+            .only("attendee_count", "maximum_attendees")
+        }
+        subscribed = set(
+            Attendance.objects.filter(
+                user_id=user_id, event_id__in=event_ids
+            ).values_list("event_id", flat=True)
+        )
+
+        outcomes = {}
+        accepted = []
+        for event_id in event_ids:
+            event = events.get(event_id)
+            if event is None:
+                outcomes[event_id] = NOT_FOUND
+            elif event_id in subscribed:
+                outcomes[event_id] = ALREADY_SUBSCRIBED
+            elif event.attendee_count >= event.maximum_attendees:
+                outcomes[event_id] = FULL
+            else:
+                accepted.append(event_id)
+                outcomes[event_id] = SUBSCRIBED
+
+        if accepted:
+            Attendance.objects.bulk_create(
+                [
+                    Attendance(event_id=event_id, user_id=user_id)
+                    for event_id in accepted
+                ],
+                ignore_conflicts=True,
+            )
+            Event.objects.filter(pk__in=accepted).update(
+                attendee_count=F("attendee_count") + 1,
+                attendees_updated_date=timezone.now(),
+            )
+
+    for event_id in accepted:
+        event_cache.invalidate_event(event_id)
+    return outcomes
@@ -0,0 +1,82 @@
+"""
+Queued admission for subscribes, enabled by EVENTS_SUBSCRIBE_QUEUE.
+
+A subscribe request only inserts a SubscriptionTicket and is answered with its id,
+so a burst on one event does not queue up on the event row lock. The
+process_subscription_tickets command decides the pending tickets in batches: per
+event of a batch, one capacity check under the row lock, one bulk INSERT and one
+counter UPDATE, see subscriptions.subscribe_users. Tickets get the outcome a direct
+subscribe would have had, users past capacity join the waitlist.
+"""
+
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import subscriptions
+from .models import Event, SubscriptionTicket
+
+
+def request_subscription(event_id, user_id):
+    """Queue a subscribe of the user to the event and return its ticket"""
+    try:
+        with transaction.atomic():
+            return SubscriptionTicket.objects.create(event_id=event_id, user_id=user_id)
+    except IntegrityError:
+        pass
+    # The same request is queued already
+    ticket = SubscriptionTicket.objects.filter(
+        event_id=event_id, user_id=user_id, status=SubscriptionTicket.PENDING
+    ).first()
+    if ticket is None:
+        # Decided in the meantime, this request is a new one
+        return SubscriptionTicket.objects.create(event_id=event_id, user_id=user_id)
+    return ticket
+
+
+def cancel_subscription(event_id, user_id):
+    """Cancel the pending ticket of the user for the event, return whether there was one"""
+    return bool(
+        SubscriptionTicket.objects.filter(
+            event_id=event_id, user_id=user_id, status=SubscriptionTicket.PENDING
+        ).update(status=SubscriptionTicket.CANCELLED, processed_date=timezone.now())
+    )
+
+
+def process_tickets(batch_size):
+    """
+    Decide up to batch_size pending tickets in arrival order and return how many.
+
+    Tickets taken by another worker are skipped, and the events of a batch are locked
+    in id order, so workers can run side by side.
+    """
+    with transaction.atomic():
+        tickets = list(
+            SubscriptionTicket.objects.select_for_update(skip_locked=True)
+            .filter(status=SubscriptionTicket.PENDING)
+            .order_by("id")
+            .values_list("pk", "event_id", "user_id")[:batch_size]
+        )
+        requests = defaultdict(dict)
+        for ticket_id, event_id, user_id in tickets:
+            requests[event_id][user_id] = ticket_id
+
+        decided = defaultdict(list)
+        for event_id in sorted(requests):
+            ticket_ids = requests[event_id]
+            try:
+                outcomes = subscriptions.subscribe_users(
+                    event_id, list(ticket_ids), waitlist=True
+                )
+            except Event.DoesNotExist:
+                outcomes = dict.fromkeys(ticket_ids, subscriptions.NOT_FOUND)
+            for user_id, outcome in outcomes.items():
+                decided[outcome].append(ticket_ids[user_id])
+
+        now = timezone.now()
+        for outcome, ticket_ids in decided.items():
+            SubscriptionTicket.objects.filter(pk__in=ticket_ids).update(
+                status=outcome, processed_date=now
+            )
+    return len(tickets)
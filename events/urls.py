@@ -1,16 +1,45 @@
 from django.urls import path
 
-from .views import (EventsDetailUpdateView, EventsListCreateView,
-                    EventSubscribeAndUnsubscribeView)
+from .views import (EventAttendeesView, EventBulkSubscribeView,
+                    EventCacheStatsView, EventExportView, EventsBulkCreateView,
+                    EventsBulkSubscribeView, EventsDetailUpdateView,
+                    EventsListCreateView, EventSubscribeAndUnsubscribeView,
+                    SubscriptionTicketView)
 
 urlpatterns = [
     path("", EventsListCreateView.as_view(), name="events-list-create"),
+    path("bulk/", EventsBulkCreateView.as_view(), name="events-bulk-create"),
+    path(
+        "subscribe/bulk/",
+        EventsBulkSubscribeView.as_view(),
+        name="events-subscribe-bulk",
+    ),
+    path("export/", EventExportView.as_view(), name="events-export"),
+    path(
+        "export/<str:export_format>/",
+        EventExportView.as_view(),
+        name="events-export-format",
+    ),
+    path(
+        "tickets/<int:pk>/",
+        SubscriptionTicketView.as_view(),
+        name="events-subscription-ticket",
+    ),
+    path("cache/stats/", EventCacheStatsView.as_view(), name="events-cache-stats"),
     path("<int:pk>/", EventsDetailUpdateView.as_view(), name="events-detail-update"),
+    path(
+        "<int:pk>/attendees/", EventAttendeesView.as_view(), name="events-attendees"
+    ),
     path(
         "<int:pk>/subscribe/",
         EventSubscribeAndUnsubscribeView.as_view(),
         name="events-subscribe",
     ),
+    path(
+        "<int:pk>/subscribe/bulk/",
+        EventBulkSubscribeView.as_view(),
+        name="events-bulk-subscribe",
+    ),
     path(
         "<int:pk>/unsubscribe/",
         EventSubscribeAndUnsubscribeView.as_view(),
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import AttendingEventsView, OwnedEventsView
+
+urlpatterns = [
+    path("owned/", OwnedEventsView.as_view(), name="user-events-owned"),
+    path("attending/", AttendingEventsView.as_view(), name="user-events-attending"),
+]
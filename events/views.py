@@ -1,25 +1,55 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from .mixins import QuerysetFilterMixin
-from .models import Event
-from .permissions import IsOwnerOrReadOnly
+from users.authentication import StatelessJWTAuthentication
+
+from . import cache as event_cache
+from . import export, tickets
+from .mixins import (
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    EventValuesPageMixin,
+    QuerysetFilterMixin,
+)
+from .models import Attendance, Event, SubscriptionTicket
+from .pagination import AttendeeCursorPagination, EventCursorPagination
+from .permissions import IsOwnerOrAdmin, IsOwnerOrReadOnly
 from .serializers import (
+    EventAttendeeSerializer,
+    EventBulkSubscribeSerializer,
     EventDetailUpdateSerializer,
     EventListCreateSerializer,
+    EventsBulkSubscribeSerializer,
     EventSubscribeSerializer,
+    SubscriptionTicketSerializer,
 )
 
 
-class EventsListCreateView(QuerysetFilterMixin, generics.ListCreateAPIView):
+class EventsListCreateView(
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    QuerysetFilterMixin,
+    EventValuesPageMixin,
+    generics.ListCreateAPIView,
+):
     """
     This view allows list without login and create with login and allow search using basic params such as:
-    status: past,future,cancelled
-    id,name,owner,description,event_type
+    status: past,future,cancelled, as in the status_code field
+    id,owner: exact match
+    name,description,event_type: contains
+    q: full-text search over name and description, results best match first
+    The list is paginated by cursor over (start_date, id), see `cursor` and `page_size` params.
     """
 
     queryset = Event.objects.all()
     serializer_class = EventListCreateSerializer
+    authentication_classes = [StatelessJWTAuthentication]
+    pagination_class = EventCursorPagination
 
     def get_permissions(self):
         if self.request.method == "POST":
@@ -28,30 +58,233 @@ class EventsListCreateView(QuerysetFilterMixin, generics.ListCreateAPIView):
             permission_classes = [permissions.AllowAny]
         return [permission() for permission in permission_classes]
 
+
+class UserEventsView(QuerysetFilterMixin, EventValuesPageMixin, generics.ListAPIView):
+    """
+    Base of the event lists of the request user, in the order and pages of the event list.
+    Filters are `status` and `q`, the list is one query on an index of the user's events.
+    """
+
+    serializer_class = EventListCreateSerializer
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = EventCursorPagination
+    filter_lookups = {}
+
+
+class OwnedEventsView(UserEventsView):
+    """This view lists the events the user owns, on event_owner_start_idx"""
+
     def get_queryset(self):
-        queryset = super().get_queryset()
-        return self.filter_queryset(queryset)
+        return Event.objects.filter(owner_id=self.request.user.pk)
+
 
+class AttendingEventsView(UserEventsView):
+    """This view lists the events the user is subscribed to, on attendance_user_history_idx"""
+
+    def get_queryset(self):
+        return Event.objects.filter(attendances__user_id=self.request.user.pk)
 
-class EventsDetailUpdateView(generics.RetrieveUpdateAPIView):
-    """This view allow user to only Retrieve and update the specific event"""
+
+class EventExportView(QuerysetFilterMixin, generics.GenericAPIView):
+    """
+    This view streams every event matching the list filters as json, ndjson or csv.
+    Rows are read from the database in chunks and written as they are encoded,
+    so memory does not grow with the catalog.
+    """
+
+    queryset = Event.objects.all()
+    # Rows have the fields of the list, used by the API schema
+    serializer_class = EventListCreateSerializer
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, export_format="ndjson"):
+        if export_format not in export.FORMATS:
+            raise NotFound()
+        encode, content_type = export.FORMATS[export_format]
+        # Filters are validated here, before the response starts
+        queryset = self.filter_queryset(self.get_queryset()).order_by(
+            "start_date", "id"
+        )
+
+        response = StreamingHttpResponse(
+            encode(export.get_rows(queryset)), content_type=content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="events.{export_format}"'
+        )
+        return response
+
+
+class EventsBulkCreateView(generics.CreateAPIView):
+    """
+    This view creates many events in one request, the body is a list of events.
+    Nothing is created unless every event is valid, errors are reported by list index.
+    """
+
+    serializer_class = EventListCreateSerializer
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.EVENTS_BULK_MAX_SIZE,
+        )
+        if not serializer.is_valid():
+            errors = serializer.errors
+            if isinstance(errors, list):
+                errors = {index: error for index, error in enumerate(errors) if error}
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        events = serializer.save()
+        return Response(
+            {"created": len(events), "ids": [event.pk for event in events]},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class EventsDetailUpdateView(
+    CachedResponseMixin, ConditionalGetMixin, generics.RetrieveUpdateAPIView
+):
+    """
+    This view allow user to only Retrieve and update the specific event.
+    Attendees are listed by EventAttendeesView, or inline with ?expand=attendees
+    """
 
     queryset = Event.objects.all()
     serializer_class = EventDetailUpdateSerializer
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsOwnerOrReadOnly]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method in permissions.SAFE_METHODS:
+            # An update changes the status, the response computes it from the saved event
+            queryset = queryset.with_status()
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["expand"] = set(self.request.query_params.get("expand", "").split(","))
+        return context
+
+
+class EventAttendeesView(generics.ListAPIView):
+    """This view lists the attendees of the event in signup order, paginated by cursor"""
+
+    serializer_class = EventAttendeeSerializer
+    authentication_classes = [StatelessJWTAuthentication]
+    pagination_class = AttendeeCursorPagination
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            # The API schema is built without a pk
+            return Attendance.objects.none()
+        event_id = self.kwargs["pk"]
+        if not Event.objects.filter(pk=event_id).exists():
+            raise NotFound()
+        # Only columns of attendance_event_signup_idx, read from the index alone
+        return Attendance.objects.filter(event_id=event_id).values(
+            "user_id", "subscribed_at"
+        )
+
 
 class EventSubscribeAndUnsubscribeView(generics.UpdateAPIView):
-    """This view is for subscribing and unsubscribing to the event. This update list_of_attendees"""
+    """
+    This view is for subscribing and unsubscribing to the event. This update list_of_attendees.
+    With EVENTS_SUBSCRIBE_QUEUE, subscribes are queued and answered 202 with a ticket,
+    see SubscriptionTicketView, and unsubscribing first cancels a queued subscribe.
+    """
 
     queryset = Event.objects.all()
     serializer_class = EventSubscribeSerializer
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def update(self, request, *args, **kwargs):
         event = self.get_object()
+        if settings.EVENTS_SUBSCRIBE_QUEUE:
+            if "/unsubscribe" not in request.path:
+                ticket = tickets.request_subscription(event.pk, request.user.pk)
+                return Response(
+                    {"message": "Subscription queued", "ticket": ticket.pk},
+                    status=status.HTTP_202_ACCEPTED,
+                    headers={
+                        "Location": reverse(
+                            "events-subscription-ticket", kwargs={"pk": ticket.pk}
+                        )
+                    },
+                )
+            if tickets.cancel_subscription(event.pk, request.user.pk):
+                return Response(
+                    {"message": "Subscription request cancelled"},
+                    status=status.HTTP_200_OK,
+                )
+
         serializer = self.get_serializer(event, data={})
         serializer.is_valid()
         message = serializer.save()
 
         return Response({"message": message}, status=status.HTTP_200_OK)
+
+
+class SubscriptionTicketView(generics.RetrieveAPIView):
+    """This view reports a queued subscribe of the user, pending or its outcome"""
+
+    serializer_class = SubscriptionTicketSerializer
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # Tickets of other users are not found
+        return SubscriptionTicket.objects.filter(user_id=self.request.user.pk)
+
+
+class EventBulkSubscribeView(generics.GenericAPIView):
+    """
+    This view subscribes many users to one event, only for its owner or an admin.
+    Seats left are handed out in list order, the result of each user is reported.
+    """
+
+    queryset = Event.objects.all()
+    serializer_class = EventBulkSubscribeSerializer
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
+
+    def post(self, request, *args, **kwargs):
+        event = self.get_object()
+        serializer = self.get_serializer(event, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class EventsBulkSubscribeView(generics.GenericAPIView):
+    """This view subscribes the user to many events, the result of each event is reported"""
+
+    serializer_class = EventsBulkSubscribeSerializer
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class EventCacheStatsView(APIView):
+    """This view shows the hit and miss counters of the event response cache"""
+
+    permission_classes = [permissions.IsAdminUser]
+    authentication_classes = [StatelessJWTAuthentication]
+
+    def get(self, request):
+        return Response(event_cache.get_stats())
@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "events_manager.settings")
+# No persistent connections under ASGI: the async ORM runs every query in a
+# sync_to_async thread, which opens its own connection and never gets back to the
+# request that would close it, so connections pile up instead of being reused.
+# https://docs.djangoproject.com/en/4.1/ref/databases/#persistent-connections
+os.environ["DB_CONN_MAX_AGE"] = "0"
 
 application = get_asgi_application()
@@ -0,0 +1,25 @@
+"""
+JSON parser on orjson, with the results and errors of DRF's JSONParser.
+
+Falls back to JSONParser without orjson installed and for bodies not in UTF-8.
+"""
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer, orjson
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            # Rejects NaN and Infinity, as JSONParser with STRICT_JSON
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,74 @@
+"""
+JSON renderer on orjson, byte for byte the output of DRF's JSONRenderer.
+
+orjson encodes the plain types and datetimes, with Z for UTC as DRF does. What it
+does not know (Decimal, timedelta, lazy strings, querysets...) goes through DRF's
+JSONEncoder.default. orjson writes floats below 1e-4 or from 1e16 up differently,
+1e16 and 1.5e-7 against 1e+16 and 1.5e-07, and NaN and infinities as null where
+JSONRenderer raises. Data holding such a float, or Decimal, which DRF's encoder
+turns into a float, is rendered by JSONRenderer. So is everything without orjson
+installed, and the options orjson does not support (indent, ASCII or non-compact
+output).
+
+The one difference left is UTC offsets with seconds, which orjson rounds to the
+minute; only historical local mean times have them. Floats inside the objects
+JSONEncoder.default converts, querysets and generators, are not looked at.
+"""
+
+import datetime
+import decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else None
+
+# Values holding no float, skipped without a look
+SCALARS = {str, int, bool, type(None), datetime.datetime, datetime.date}
+
+
+def floats_match(value):
+    """Whether orjson writes every float of value as json.dumps does"""
+    if value.__class__ in SCALARS:
+        return True
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        if isinstance(value, (float, decimal.Decimal)):
+            # As DRF's encoder does, NaN compares false below
+            value = float(value)
+            return not value or 1e-4 <= abs(value) < 1e16
+        return True
+    for item in value:
+        if item.__class__ not in SCALARS and not floats_match(item):
+            return False
+    return True
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            or not floats_match(data)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            # Integers past 64 bits, among others
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # As JSONRenderer, the output is a strict javascript subset
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -0,0 +1,148 @@
+"""
+Database routing between the primary and the read replicas of DATABASE_REPLICAS.
+
+Reads go to a replica only inside a request that replica_middleware marked as
+read-only: a GET, HEAD or OPTIONS from a client that has not written in the last
+DATABASE_PRIMARY_STICKY_SECONDS. Everything else, writes, reads after a write and
+code running outside a request, uses the primary, so nobody reads a replica that
+has not caught up with their own writes yet.
+
+A client is recognized by a cookie, and by its user id in the cache for clients
+that do not keep cookies. JWT authentication runs in the view, after the
+middleware, so the user is checked on the first read that knows it.
+"""
+
+import random
+from asyncio import iscoroutinefunction
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.functional import SimpleLazyObject, empty
+
+PRIMARY = "default"
+STICKY_COOKIE = "use_primary"
+
+replica_reads = ContextVar("replica_reads", default=False)
+current_request = ContextVar("current_request", default=None)
+
+
+def sticky_key(user_id):
+    return f"routers:use_primary:{user_id}"
+
+
+def reads_from_replica():
+    """Whether the reads of the current request go to a replica"""
+    return replica_reads.get() and bool(settings.DATABASE_REPLICAS)
+
+
+def get_user_id(request):
+    """Id of the user authenticated for request so far, None when not known yet"""
+    # AuthenticationMiddleware sets a lazy session user, evaluating it would query
+    # the database from the router. DRF replaces it with the user it authenticated.
+    user = request.__dict__.get("user")
+    if user is None:
+        return None
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return user.pk if user.is_authenticated else None
+
+
+def user_wrote_recently():
+    """Whether the user of the current request is pinned to the primary, looked up once"""
+    request = current_request.get()
+    if request is None or getattr(request, "_sticky_checked", False):
+        return False
+    user_id = get_user_id(request)
+    if user_id is None:
+        return False
+    request._sticky_checked = True
+    return bool(cache.get(sticky_key(user_id)))
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if reads_from_replica():
+            if not user_wrote_recently():
+                return random.choice(settings.DATABASE_REPLICAS)
+            replica_reads.set(False)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        # The rest of the request reads what it has just written
+        replica_reads.set(False)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == PRIMARY
+
+
+@sync_and_async_middleware
+def replica_middleware(get_response):
+    """
+    Lets the safe requests of ReplicaRouter read from the replicas, and pins the
+    client to the primary with a short-lived cookie and user cache entry after an
+    unsafe request.
+    Async capable, an ASGI request does not hop to a thread to pass through it.
+    """
+
+    def is_safe(request):
+        return request.method in ("GET", "HEAD", "OPTIONS")
+
+    def pin_to_primary(request, response):
+        if not is_safe(request):
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=settings.DATABASE_PRIMARY_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+            user_id = get_user_id(request)
+            if user_id is not None:
+                cache.set(
+                    sticky_key(user_id),
+                    True,
+                    timeout=settings.DATABASE_PRIMARY_STICKY_SECONDS,
+                )
+        return response
+
+    def start(request):
+        return (
+            replica_reads.set(
+                is_safe(request) and STICKY_COOKIE not in request.COOKIES
+            ),
+            current_request.set(request),
+        )
+
+    def finish(tokens):
+        replica_token, request_token = tokens
+        replica_reads.reset(replica_token)
+        current_request.reset(request_token)
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            tokens = start(request)
+            try:
+                response = await get_response(request)
+            finally:
+                finish(tokens)
+            return pin_to_primary(request, response)
+
+    else:
+
+        def middleware(request):
+            tokens = start(request)
+            try:
+                response = get_response(request)
+            finally:
+                finish(tokens)
+            return pin_to_primary(request, response)
+
+    return middleware
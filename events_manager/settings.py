@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "events_manager.routers.replica_middleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -89,6 +91,67 @@ DATABASES = {
         "NAME": BASE_DIR / "db.sqlite3",
     }
 }
+if os.environ.get("DB_NAME"):
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ["DB_NAME"],
+        "USER": os.environ.get("DB_USER", ""),
+        "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+        "HOST": os.environ.get("DB_HOST", ""),
+        "PORT": os.environ.get("DB_PORT", ""),
+        # Keep connections open between requests, seconds, 0 closes after each one.
+        # Under ASGI always 0, see asgi.py.
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        # Test a reused connection once per request before using it
+        "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1",
+        "OPTIONS": {
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+        },
+    }
+    if os.environ.get("DB_PGBOUNCER") == "1":
+        # Behind PgBouncer in transaction pooling mode a server side cursor can
+        # outlive its transaction's server connection, iterator() fetches rows
+        # client side instead.
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+# Read replicas, see events_manager/routers.py
+
+DATABASE_ROUTERS = ["events_manager.routers.ReplicaRouter"]
+DATABASE_REPLICAS = []
+if os.environ.get("DB_NAME") and os.environ.get("DB_REPLICA_HOSTS"):
+    for index, host in enumerate(os.environ["DB_REPLICA_HOSTS"].split(","), 1):
+        DATABASES[f"replica_{index}"] = {
+            **DATABASES["default"],
+            "HOST": host,
+            # Tests read the rows they write, through the test primary
+            "TEST": {"MIRROR": "default"},
+        }
+        DATABASE_REPLICAS.append(f"replica_{index}")
+# Seconds a client reads from the primary after a write, longer than the replica lag
+DATABASE_PRIMARY_STICKY_SECONDS = int(os.environ.get("DB_PRIMARY_STICKY_SECONDS", 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Set REDIS_URL to share the cache between processes, locmem is per process.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
+
+# Event response cache, see events/cache.py
+EVENTS_CACHE_ALIAS = "default"
+EVENTS_CACHE_TIMEOUT = 300
+# Whether every process reads the same EVENTS_CACHE_ALIAS. The list ETag comes from
+# its versions, so the list has no validators with a per process cache.
+EVENTS_CACHE_SHARED = bool(os.environ.get("REDIS_URL"))
 
 
 # Password validation
@@ -139,11 +202,58 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    # The JSON output and parsing of the DRF defaults, through orjson
+    "DEFAULT_RENDERER_CLASSES": (
+        "events_manager.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "events_manager.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 
+# Keyset pagination of event listings, see events/pagination.py
+
+EVENTS_PAGE_SIZE = 50
+EVENTS_MAX_PAGE_SIZE = 500
+
+# Bulk event creation, see events.views.EventsBulkCreateView
+
+EVENTS_BULK_MAX_SIZE = 10_000
+EVENTS_BULK_BATCH_SIZE = 1_000
+
+# Streaming export, see events.views.EventExportView
+
+EVENTS_EXPORT_CHUNK_SIZE = 2_000
+
+# Queued subscribes, see events/tickets.py. When enabled, run
+# `python manage.py process_subscription_tickets` next to the web processes.
+
+EVENTS_SUBSCRIBE_QUEUE = os.environ.get("EVENTS_SUBSCRIBE_QUEUE") == "1"
+EVENTS_SUBSCRIBE_QUEUE_BATCH_SIZE = 1_000
+EVENTS_SUBSCRIBE_QUEUE_INTERVAL = 0.2
+
+# Sharded attendee counters, see events/counters.py. 0 counts on the event row.
+# When enabled, run `python manage.py compact_attendee_counters` next to the web
+# processes, attendee counts lag by up to the interval. After going back to 0, run
+# it once with --once.
+
+EVENTS_ATTENDEE_SHARDS = int(os.environ.get("EVENTS_ATTENDEE_SHARDS", 0))
+EVENTS_ATTENDEE_SHARDS_COMPACT_INTERVAL = 1.0
+
+
 SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("JWT",),
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "users.tokens.ClaimsTokenObtainPairSerializer",
 }
+
+# Seconds users.authentication.StatelessJWTAuthentication trusts the is_active
+# claim before checking the database again, None trusts it until the token expires.
+# Refreshed access tokens inherit the claim of the refresh token, so a deactivated
+# user would keep access for REFRESH_TOKEN_LIFETIME without the check.
+JWT_ACTIVE_CHECK_TTL = 60
@@ -38,4 +38,6 @@ urlpatterns = [
     path("api/auth/", include("djoser.urls")),
     path("api/auth/", include("djoser.urls.jwt")),
     path("api/events/", include("events.urls")),
+    path("api/async/events/", include("events.async_urls")),
+    path("api/users/me/events/", include("events.user_urls")),
 ]
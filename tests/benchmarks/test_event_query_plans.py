@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import pytest
+from django.db import connection
+
+# The benchmark scripts import their helpers as top level modules
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "benchmarks"))
+
+import event_query_plans  # noqa: E402
+from utils import seed_events  # noqa: E402
+
+
+def list_index_names():
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, "events_event")
+    return {name for name in constraints if name in event_query_plans.LIST_INDEXES}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_event_query_plans_runs_against_current_schema(capsys):
+    """Test the benchmark seeds the migrated schema and swaps the list indexes"""
+    seed_events(20, batch_size=10)
+
+    event_query_plans.set_list_indexes(connection, enabled=False)
+    assert list_index_names() == set()
+    event_query_plans.report("Before indexes", page_size=5)
+
+    event_query_plans.set_list_indexes(connection, enabled=True)
+    assert list_index_names() == set(event_query_plans.LIST_INDEXES)
+    event_query_plans.report("After indexes", page_size=5)
+
+    assert "--- first page" in capsys.readouterr().out
@@ -1,11 +1,67 @@
+from unittest import mock
+
 import pytest
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APIClient
 
+from events.models import Event
+
 User = get_user_model()
 
 
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(
+    django_db_modify_db_settings_parallel_suffix, tmp_path_factory
+):
+    """
+    Put the SQLite test database in a file: the threads of the concurrency tests
+    each open a connection, and an in-memory database shared between connections
+    fails on a locked table instead of waiting for it.
+    """
+    for alias, database in settings.DATABASES.items():
+        if database["ENGINE"] != "django.db.backends.sqlite3":
+            continue
+        database.setdefault("TEST", {})["NAME"] = str(
+            tmp_path_factory.mktemp("db") / f"test_{alias}.sqlite3"
+        )
+        # Seconds a connection waits for the write lock held by another one
+        database.setdefault("OPTIONS", {}).setdefault("timeout", 30)
+
+
+@pytest.fixture
+def serialized_writers():
+    """
+    Make every transaction take the SQLite write lock when it begins, as
+    PostgreSQL row locks order the concurrent writers. A deferred transaction
+    that reads before it writes fails at once when another one holds the lock.
+    Does nothing on other databases.
+    """
+    if connection.vendor != "sqlite":
+        yield
+        return
+
+    def begin_immediate(self):
+        self.cursor().execute("BEGIN IMMEDIATE")
+
+    with mock.patch.object(
+        SQLiteDatabaseWrapper, "_start_transaction_under_autocommit", begin_immediate
+    ):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached responses must not leak between tests"""
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -36,6 +92,41 @@ def create_user(api_client, valid_payload):
     return _create_user
 
 
+@pytest.fixture
+def create_event(valid_user):
+    def _create_event(maximum_attendees=50, **fields):
+        start_date = fields.get("start_date") or (
+            timezone.now() + timezone.timedelta(days=1)
+        )
+        defaults = {
+            "name": "Wine tasting",
+            "owner": valid_user,
+            "description": "Try wines from all over Portugal",
+            "start_date": start_date,
+            "end_date": start_date + timezone.timedelta(hours=5),
+            "event_type": "Meeting",
+            "maximum_attendees": maximum_attendees,
+        }
+        return Event.objects.create(**{**defaults, **fields})
+
+    return _create_event
+
+
+@pytest.fixture
+def event(create_event):
+    return create_event()
+
+
+@pytest.fixture
+def create_users():
+    def _create_users(count, prefix="attendee"):
+        return User.objects.bulk_create(
+            User(email=f"{prefix}{index}@example.com") for index in range(count)
+        )
+
+    return _create_users
+
+
 @pytest.fixture
 def login_user(api_client, create_user, valid_payload):
     def _login_user(payload=valid_payload):
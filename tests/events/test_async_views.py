@@ -0,0 +1,199 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from events.models import Event, SubscriptionTicket
+
+
+def request(method, url, token=None, enforce_csrf_checks=False):
+    """Request through the async handler stack, as under ASGI"""
+    # AsyncClient of Django 4.1 takes headers by their name, without HTTP_
+    extra = {"authorization": f"JWT {token}"} if token else {}
+    client = AsyncClient(enforce_csrf_checks=enforce_csrf_checks)
+
+    async def send():
+        return await getattr(client, method)(url, **extra)
+
+    return async_to_sync(send)()
+
+
+def get(url):
+    return request("get", url)
+
+
+def put(url, token=None, enforce_csrf_checks=False):
+    return request("put", url, token, enforce_csrf_checks)
+
+
+@pytest.fixture
+def events(valid_user):
+    start_date = timezone.now() + timezone.timedelta(days=1)
+    return [
+        Event.objects.create(
+            name=f"Wine tasting {index}",
+            owner=valid_user,
+            description="Try wines from all over Portugal",
+            start_date=start_date + timezone.timedelta(hours=index),
+            end_date=start_date + timezone.timedelta(hours=index + 5),
+            event_type="Meeting",
+            active=index != 2,
+        )
+        for index in range(5)
+    ]
+
+
+@pytest.fixture
+def access_token(login_user):
+    return login_user().data["access"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query", ["", "?page_size=2", "?status=cancelled", "?q=wine&page_size=3"]
+)
+def test_async_list_matches_list(api_client, events, query):
+    """Test the async list walks the same pages as the DRF list"""
+    url = reverse("async-events-list") + query
+    expected_url = reverse("events-list-create") + query
+    while url:
+        response = get(url)
+        expected = api_client.get(expected_url)
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()["results"]
+        assert results == expected.json()["results"]
+        assert results
+
+        url = response.json()["next"]
+        expected_url = expected.json()["next"]
+        assert (url is None) == (expected_url is None)
+
+
+@pytest.mark.django_db
+def test_async_list_invalid_filter():
+    response = get(reverse("async-events-list") + "?colour=red")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"error": "Invalid filter parameter 'colour'"}
+
+
+@pytest.mark.django_db
+def test_async_detail_matches_detail(api_client, events):
+    event = events[0]
+
+    response = get(reverse("async-events-detail", kwargs={"pk": event.pk}))
+
+    expected = api_client.get(reverse("events-detail-update", kwargs={"pk": event.pk}))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == expected.json()
+
+
+@pytest.mark.django_db
+def test_async_detail_unknown_event():
+    response = get(reverse("async-events-detail", kwargs={"pk": 9999}))
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_async_subscribe_and_unsubscribe(events, access_token):
+    event = events[0]
+    subscribe_url = reverse("async-events-subscribe", kwargs={"pk": event.pk})
+    unsubscribe_url = reverse("async-events-unsubscribe", kwargs={"pk": event.pk})
+
+    response = put(subscribe_url, access_token)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"message": "Subscribed to the event"}
+    event.refresh_from_db()
+    assert event.attendee_count == 1
+
+    response = put(subscribe_url, access_token)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"message": "Already Subscribed"}
+
+    response = put(unsubscribe_url, access_token)
+    assert response.json() == {"message": "Unsubscribed from the event"}
+    event.refresh_from_db()
+    assert event.attendee_count == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url_name, message",
+    [
+        ("async-events-subscribe", "Subscribed to the event"),
+        ("async-events-unsubscribe", "Already Unsubscribed"),
+    ],
+)
+def test_async_subscribe_without_csrf_token(events, access_token, url_name, message):
+    """Test JWT clients need no CSRF token, as on the DRF views"""
+    url = reverse(url_name, kwargs={"pk": events[0].pk})
+
+    response = put(url, access_token, enforce_csrf_checks=True)
+
+    assert response.status_code != status.HTTP_403_FORBIDDEN
+    assert response.json() == {"message": message}
+
+
+@pytest.mark.django_db
+def test_async_subscribe_full_event_waitlists(events, access_token):
+    event = events[0]
+    Event.objects.filter(pk=event.pk).update(maximum_attendees=0)
+    subscribe_url = reverse("async-events-subscribe", kwargs={"pk": event.pk})
+    unsubscribe_url = reverse("async-events-unsubscribe", kwargs={"pk": event.pk})
+
+    response = put(subscribe_url, access_token)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"message": "Event is full, added to the waitlist"}
+
+    response = put(subscribe_url, access_token)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"message": "Already on the waitlist"}
+
+    response = put(unsubscribe_url, access_token)
+    assert response.json() == {"message": "Removed from the waitlist"}
+    assert not event.waitlist.exists()
+
+
+@pytest.mark.django_db
+@override_settings(EVENTS_SUBSCRIBE_QUEUE=True)
+def test_async_subscribe_queued(events, access_token):
+    event = events[0]
+
+    response = put(
+        reverse("async-events-subscribe", kwargs={"pk": event.pk}), access_token
+    )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    ticket = SubscriptionTicket.objects.get(pk=response.json()["ticket"])
+    assert ticket.event_id == event.pk
+    assert response["Location"] == reverse(
+        "events-subscription-ticket", kwargs={"pk": ticket.pk}
+    )
+
+    response = put(
+        reverse("async-events-unsubscribe", kwargs={"pk": event.pk}), access_token
+    )
+
+    assert response.json() == {"message": "Subscription request cancelled"}
+
+
+@pytest.mark.django_db
+def test_async_subscribe_without_login(events):
+    response = put(reverse("async-events-subscribe", kwargs={"pk": events[0].pk}))
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response["WWW-Authenticate"]
+
+
+@pytest.mark.django_db
+def test_async_subscribe_unknown_event(access_token):
+    response = put(
+        reverse("async-events-subscribe", kwargs={"pk": 9999}),
+        access_token,
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
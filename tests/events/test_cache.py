@@ -0,0 +1,231 @@
+import fakeredis
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events import cache as event_cache
+from events import subscriptions
+from events.models import Event
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_event_list_cache_hit(api_client, event, django_assert_num_queries):
+    url = reverse("events-list-create")
+    first_response = api_client.get(url)
+
+    with django_assert_num_queries(0):
+        second_response = api_client.get(url)
+
+    assert first_response["X-Cache"] == "MISS"
+    assert second_response["X-Cache"] == "HIT"
+    assert second_response.data == first_response.data
+
+
+@pytest.mark.django_db
+def test_event_list_cache_key_normalizes_params(api_client, event):
+    url = reverse("events-list-create")
+    api_client.get(url + "?name=wine&event_type=meet")
+
+    response = api_client.get(url + "?event_type=meet&name=wine")
+
+    assert response["X-Cache"] == "HIT"
+
+
+@pytest.mark.django_db
+def test_event_detail_cache_invalidated_on_save(
+    api_client, event, django_capture_on_commit_callbacks
+):
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    api_client.get(url)
+
+    event.name = "Beer tasting"
+    with django_capture_on_commit_callbacks(execute=True):
+        event.save()
+    response = api_client.get(url)
+
+    assert response["X-Cache"] == "MISS"
+    assert response.data["name"] == "Beer tasting"
+
+
+@pytest.mark.django_db
+def test_event_caches_invalidated_on_subscribe(
+    api_client, event, valid_user, django_capture_on_commit_callbacks
+):
+    list_url = reverse("events-list-create")
+    detail_url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    api_client.get(list_url)
+    api_client.get(detail_url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        subscriptions.subscribe(event.pk, valid_user.pk)
+
+    list_response = api_client.get(list_url)
+    detail_response = api_client.get(detail_url)
+    assert list_response["X-Cache"] == "MISS"
+    assert list_response.data["results"][0]["number_of_attendees"] == 1
+    assert detail_response["X-Cache"] == "MISS"
+    assert detail_response.data["number_of_attendees"] == 1
+
+
+@pytest.mark.django_db
+def test_event_invalidation_waits_for_commit(
+    event, valid_user, django_capture_on_commit_callbacks
+):
+    """Test a read before the commit cannot cache the old rows under a new version"""
+    keys = (event_cache.LIST_VERSION_KEY, event_cache.detail_version_key(event.pk))
+    versions = event_cache.get_versions(*keys)
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with transaction.atomic():
+            subscriptions.subscribe(event.pk, valid_user.pk)
+            assert event_cache.get_versions(*keys) == versions
+
+    assert callbacks
+    new_versions = event_cache.get_versions(*keys)
+    assert all(new != old for new, old in zip(new_versions, versions))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("written_recently", [True, False])
+def test_replica_read_cached_after_sticky_window(
+    api_client, event, django_capture_on_commit_callbacks, written_recently
+):
+    """Test a replica read right after a write is served but not cached"""
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    with django_capture_on_commit_callbacks(execute=True):
+        event.save()
+    if not written_recently:
+        cache.delete(event_cache.written_key(event_cache.detail_version_key(event.pk)))
+
+    # The primary stands in for a replica
+    with override_settings(DATABASE_REPLICAS=["default"]):
+        api_client.get(url)
+    response = api_client.get(url)
+
+    assert response["X-Cache"] == ("MISS" if written_recently else "HIT")
+
+
+@pytest.mark.django_db
+def test_event_detail_cache_invalidated_on_attendees_change(
+    api_client, event, django_capture_on_commit_callbacks
+):
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    api_client.get(url + "?expand=attendees")
+
+    user = User.objects.create_user(email="attendee@example.com")
+    with django_capture_on_commit_callbacks(execute=True):
+        user.attendees.add(event)
+    response = api_client.get(url + "?expand=attendees")
+
+    assert response["X-Cache"] == "MISS"
+    assert response.data["list_of_attendees"] == [user.pk]
+
+
+@pytest.mark.django_db
+def test_event_detail_other_events_stay_cached(api_client, event, valid_user):
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    api_client.get(url)
+
+    Event.objects.create(
+        name="Beer tasting",
+        owner=valid_user,
+        description="Try beers",
+        start_date=event.start_date,
+        end_date=event.end_date,
+        event_type="Meeting",
+    )
+    response = api_client.get(url)
+
+    assert response["X-Cache"] == "HIT"
+
+
+@pytest.mark.django_db
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        "events": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    },
+    EVENTS_CACHE_ALIAS="events",
+)
+def test_event_cache_backend_is_pluggable(api_client, event):
+    url = reverse("events-list-create")
+    api_client.get(url)
+
+    response = api_client.get(url)
+
+    assert response["X-Cache"] == "HIT"
+    event_cache.get_cache().clear()
+
+
+@pytest.fixture
+def redis_cache():
+    """
+    The event cache on Django's Redis backend, talking to fakeredis, an in process
+    stand-in for a Redis server, as REDIS_URL would set it up.
+    """
+    redis_settings = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://stand-in:6379/0",
+        "OPTIONS": {"connection_class": fakeredis.FakeConnection},
+    }
+    with override_settings(
+        CACHES={"default": redis_settings},
+        EVENTS_CACHE_SHARED=True,
+    ):
+        yield event_cache.get_cache()
+        event_cache.get_cache().clear()
+
+
+@pytest.mark.django_db
+def test_event_cache_on_redis(
+    api_client, event, redis_cache, valid_user, django_capture_on_commit_callbacks
+):
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    list_url = reverse("events-list-create")
+    first_response = api_client.get(url)
+    api_client.get(list_url)
+    second_response = api_client.get(url)
+    list_response = api_client.get(list_url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        subscriptions.subscribe(event.pk, valid_user.pk)
+    third_response = api_client.get(url)
+
+    assert isinstance(redis_cache, RedisCache)
+    assert first_response["X-Cache"] == "MISS"
+    assert second_response["X-Cache"] == "HIT"
+    assert list_response["X-Cache"] == "HIT"
+    assert "ETag" in list_response
+    assert third_response["X-Cache"] == "MISS"
+    assert third_response.data["number_of_attendees"] == 1
+    assert event_cache.get_stats() == {"hits": 2, "misses": 3}
+
+
+@pytest.mark.django_db
+def test_event_cache_stats(api_client, event):
+    admin = User.objects.create_superuser(email="admin@example.com")
+    client = APIClient()
+    client.force_authenticate(admin)
+    url = reverse("events-list-create")
+    api_client.get(url)
+    api_client.get(url)
+    api_client.get(url)
+
+    response = client.get(reverse("events-cache-stats"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"hits": 2, "misses": 1}
+
+
+@pytest.mark.django_db
+def test_event_cache_stats_requires_admin(api_client):
+    response = api_client.get(reverse("events-cache-stats"))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,200 @@
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from events import cache as event_cache
+from events import subscriptions
+from events.models import AttendeeCountShard
+
+User = get_user_model()
+
+shared_cache = override_settings(EVENTS_CACHE_SHARED=True)
+
+
+def expire_cached_responses(*events):
+    """Drop the cached responses, keeping the versions the ETags come from"""
+    keys = [event_cache.LIST_VERSION_KEY, event_cache.LIST_MODIFIED_KEY]
+    keys += [event_cache.detail_version_key(event.pk) for event in events]
+    versions = cache.get_many(keys)
+    cache.clear()
+    cache.set_many(versions, timeout=None)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("cached", [False, True])
+def test_event_detail_if_none_match(api_client, event, cached):
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    response = api_client.get(url)
+    if not cached:
+        expire_cached_responses(event)
+
+    conditional_response = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    assert response["ETag"].startswith('"')
+    assert conditional_response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert conditional_response["ETag"] == response["ETag"]
+    assert not conditional_response.content
+
+
+@pytest.mark.django_db
+def test_event_detail_if_modified_since(api_client, event):
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    response = api_client.get(url)
+    expire_cached_responses(event)
+
+    conditional_response = api_client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+
+    assert conditional_response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_event_detail_not_modified_skips_serialization(
+    api_client, event, django_assert_num_queries
+):
+    """Test a matching ETag costs the event lookup only"""
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    etag = api_client.get(url)["ETag"]
+    expire_cached_responses(event)
+
+    with django_assert_num_queries(1):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_event_detail_etag_changes_with_attendees(
+    api_client, event, valid_user, django_capture_on_commit_callbacks
+):
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    etag = api_client.get(url)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        subscriptions.subscribe(event.pk, valid_user.pk)
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+    assert response.data["number_of_attendees"] == 1
+
+
+@pytest.mark.django_db
+@shared_cache
+@override_settings(EVENTS_ATTENDEE_SHARDS=4)
+def test_event_detail_etag_changes_with_sharded_attendees(
+    api_client, event, valid_user, django_capture_on_commit_callbacks
+):
+    """Test a subscribe through a shard, which moves no date of the event, changes the ETag"""
+    attendee = User.objects.create_user(email="attendee@example.com", password="pass")
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    with django_capture_on_commit_callbacks(execute=True):
+        subscriptions.subscribe(event.pk, valid_user.pk)
+    response = api_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        subscriptions.subscribe(event.pk, attendee.pk)
+    conditional_response = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    assert AttendeeCountShard.objects.filter(event=event, count=1).exists()
+    assert "Last-Modified" not in response
+    assert conditional_response.status_code == status.HTTP_200_OK
+    assert conditional_response["ETag"] != response["ETag"]
+
+
+@pytest.mark.django_db
+@override_settings(EVENTS_ATTENDEE_SHARDS=4)
+def test_sharded_event_detail_without_shared_cache(api_client, event):
+    """Test a per process cache version gives a sharded event no validators"""
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+
+    response = api_client.get(url)
+
+    assert "ETag" not in response
+    assert "Last-Modified" not in response
+
+
+@pytest.mark.django_db
+def test_event_detail_etag_depends_on_expand(api_client, event):
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    etag = api_client.get(url)["ETag"]
+
+    response = api_client.get(url + "?expand=attendees", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_event_list_without_shared_cache(api_client, event):
+    """Test a write seen by one process only cannot leave others answering 304"""
+    response = api_client.get(reverse("events-list-create"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "ETag" not in response
+    assert "Last-Modified" not in response
+
+
+@pytest.mark.django_db
+@shared_cache
+def test_event_list_if_none_match(api_client, event, django_assert_num_queries):
+    url = reverse("events-list-create")
+    etag = api_client.get(url)["ETag"]
+    expire_cached_responses()
+
+    with django_assert_num_queries(0):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+@shared_cache
+def test_event_list_if_modified_since(api_client, event):
+    url = reverse("events-list-create")
+    last_modified = api_client.get(url)["Last-Modified"]
+    expire_cached_responses()
+
+    response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+@shared_cache
+def test_event_list_etag_changes_on_new_event(
+    api_client, event, create_event, django_capture_on_commit_callbacks
+):
+    url = reverse("events-list-create")
+    etag = api_client.get(url)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_event(name="Beer tasting", description="Try beers")
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == 2
+
+
+@pytest.mark.django_db
+@shared_cache
+def test_event_list_etag_changes_when_event_starts(api_client, event):
+    """Test statuses moved by the clock reach the list within EVENTS_CACHE_TIMEOUT"""
+    url = reverse("events-list-create")
+    etag = api_client.get(url)["ETag"]
+    cache_timeout = timezone.timedelta(seconds=settings.EVENTS_CACHE_TIMEOUT)
+    later = event.start_date + cache_timeout
+    expire_cached_responses()
+
+    with mock.patch("django.utils.timezone.now", return_value=later):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"][0]["status"].startswith("Held on")
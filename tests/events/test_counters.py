@@ -0,0 +1,208 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import override_settings
+
+from events import counters, subscriptions
+from events.models import AttendeeCountShard
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+sharded = override_settings(EVENTS_ATTENDEE_SHARDS=4)
+
+
+def shard_totals(event):
+    return AttendeeCountShard.objects.filter(event=event).aggregate(
+        count=Sum("count"), capacity=Sum("capacity")
+    )
+
+
+@sharded
+def test_first_subscribe_spreads_free_seats(create_event, valid_user):
+    event = create_event(maximum_attendees=10)
+
+    assert subscriptions.subscribe(event.pk, valid_user.pk) == subscriptions.SUBSCRIBED
+
+    event.refresh_from_db()
+    assert event.attendee_count == 1
+    capacities = AttendeeCountShard.objects.filter(event=event).order_by("slot")
+    assert list(capacities.values_list("capacity", flat=True)) == [3, 2, 2, 2]
+    assert shard_totals(event)["count"] == 0
+
+
+@sharded
+def test_subscribe_takes_seat_from_shard(create_event, create_users):
+    event = create_event(maximum_attendees=10)
+    users = create_users(4)
+    subscriptions.subscribe(event.pk, users[0].pk)
+
+    for user in users[1:]:
+        assert subscriptions.subscribe(event.pk, user.pk) == subscriptions.SUBSCRIBED
+
+    event.refresh_from_db()
+    assert event.attendee_count == 1
+    assert shard_totals(event) == {"count": 3, "capacity": 9}
+    assert event.list_of_attendees.count() == 4
+
+
+@sharded
+def test_subscribe_falls_back_to_shard_with_room(create_event, create_users):
+    event = create_event(maximum_attendees=10)
+    users = create_users(2)
+    subscriptions.subscribe(event.pk, users[0].pk)
+    AttendeeCountShard.objects.filter(event=event).exclude(slot=3).update(capacity=0)
+
+    assert counters.reserve(event.pk)
+    assert AttendeeCountShard.objects.get(event=event, slot=3).count == 1
+
+
+@sharded
+def test_sharded_subscribe_holds_capacity(create_event, create_users):
+    event = create_event(maximum_attendees=5)
+    users = create_users(8)
+
+    outcomes = [subscriptions.subscribe(event.pk, user.pk) for user in users]
+
+    assert outcomes.count(subscriptions.SUBSCRIBED) == 5
+    assert outcomes.count(subscriptions.WAITLISTED) == 3
+    event.refresh_from_db()
+    assert event.attendee_count + shard_totals(event)["count"] == 5
+    assert event.list_of_attendees.count() == 5
+
+
+@sharded
+def test_sharded_subscribe_twice_gives_seat_back(create_event, valid_user):
+    event = create_event(maximum_attendees=10)
+    subscriptions.subscribe(event.pk, valid_user.pk)
+
+    outcome = subscriptions.subscribe(event.pk, valid_user.pk)
+
+    assert outcome == subscriptions.ALREADY_SUBSCRIBED
+    event.refresh_from_db()
+    assert event.attendee_count == 1
+    assert shard_totals(event) == {"count": 0, "capacity": 9}
+
+
+@sharded
+def test_sharded_unsubscribe_promotes_waitlist(create_event, create_users):
+    event = create_event(maximum_attendees=3)
+    users = create_users(5)
+    for user in users:
+        subscriptions.subscribe(event.pk, user.pk)
+
+    outcome = subscriptions.unsubscribe(event.pk, users[1].pk)
+
+    assert outcome == subscriptions.UNSUBSCRIBED
+    event.refresh_from_db()
+    assert event.attendee_count == 3
+    assert shard_totals(event) == {"count": 0, "capacity": 0}
+    assert set(event.list_of_attendees.values_list("pk", flat=True)) == {
+        users[0].pk,
+        users[2].pk,
+        users[3].pk,
+    }
+
+
+@sharded
+def test_sharded_unsubscribe_releases_seat(create_event, create_users):
+    event = create_event(maximum_attendees=10)
+    users = create_users(3)
+    for user in users:
+        subscriptions.subscribe(event.pk, user.pk)
+
+    subscriptions.unsubscribe(event.pk, users[2].pk)
+
+    event.refresh_from_db()
+    assert event.attendee_count == 2
+    assert shard_totals(event) == {"count": 0, "capacity": 8}
+
+
+@sharded
+def test_compact_folds_shards(create_event, create_users):
+    event = create_event(maximum_attendees=10)
+    for user in create_users(4):
+        subscriptions.subscribe(event.pk, user.pk)
+
+    assert list(counters.events_to_compact()) == [event.pk]
+    call_command("compact_attendee_counters", "--once")
+
+    event.refresh_from_db()
+    assert event.attendee_count == 4
+    assert shard_totals(event) == {"count": 0, "capacity": 6}
+    assert not counters.events_to_compact().exists()
+
+
+@sharded
+def test_larger_maximum_spreads_new_seats(create_event, create_users):
+    event = create_event(maximum_attendees=2)
+    for user in create_users(2):
+        subscriptions.subscribe(event.pk, user.pk)
+
+    event.refresh_from_db()
+    event.maximum_attendees = 6
+    event.save()
+    subscriptions.promote_waitlist(event.pk)
+
+    assert shard_totals(event)["capacity"] == 4
+
+
+@sharded
+def test_subscribe_users_uses_seats_of_shards(create_event, create_users):
+    event = create_event(maximum_attendees=5)
+    users = create_users(6)
+    subscriptions.subscribe(event.pk, users[0].pk)
+    subscriptions.subscribe(event.pk, users[1].pk)
+
+    outcomes = subscriptions.subscribe_users(event.pk, [user.pk for user in users[2:]])
+
+    assert list(outcomes.values()).count(subscriptions.SUBSCRIBED) == 3
+    event.refresh_from_db()
+    assert event.attendee_count == 5
+    assert shard_totals(event) == {"count": 0, "capacity": 0}
+
+
+@override_settings(EVENTS_ATTENDEE_SHARDS=0)
+def test_compact_after_disabling_releases_shards(create_event, create_users):
+    event = create_event(maximum_attendees=10)
+    users = create_users(3)
+    with override_settings(EVENTS_ATTENDEE_SHARDS=4):
+        for user in users:
+            subscriptions.subscribe(event.pk, user.pk)
+
+    call_command("compact_attendee_counters", "--once")
+
+    event.refresh_from_db()
+    assert event.attendee_count == 3
+    assert shard_totals(event) == {"count": 0, "capacity": 0}
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(EVENTS_ATTENDEE_SHARDS=8)
+def test_concurrent_sharded_subscribe_holds_capacity(
+    create_event, create_users, serialized_writers
+):
+    """Test 200 concurrent subscribes over 8 shards fill the event exactly to capacity"""
+    event = create_event(maximum_attendees=50)
+    users = create_users(200)
+
+    def subscribe(user):
+        try:
+            return subscriptions.subscribe(event.pk, user.pk)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=50) as executor:
+        outcomes = list(executor.map(subscribe, users))
+
+    counters.compact(event.pk)
+    event.refresh_from_db()
+    assert outcomes.count(subscriptions.SUBSCRIBED) == 50
+    assert event.attendee_count == 50
+    assert event.list_of_attendees.count() == 50
+    assert event.waitlist.count() == 150
@@ -1,7 +1,7 @@
 import pytest
 from django.utils import timezone
 
-from events.models import Event
+from events.models import Event, EventStatus
 from users.models import CustomUser
 
 
@@ -41,3 +41,33 @@ def test_events_model(create_user):
     assert not events.list_of_attendees.exists()
     assert events.created_date
     assert events.updated_date
+
+
+@pytest.mark.django_db
+def test_events_with_status_matches_status_code(valid_user):
+    now = timezone.now()
+    for start_date, active in [
+        (now - timezone.timedelta(hours=1), True),
+        (now + timezone.timedelta(hours=1), True),
+        (now + timezone.timedelta(hours=1), False),
+    ]:
+        Event.objects.create(
+            name="Wine tasting",
+            owner=valid_user,
+            description="Try wines from all over Portugal",
+            start_date=start_date,
+            end_date=start_date + timezone.timedelta(hours=5),
+            event_type="Meeting",
+            active=active,
+        )
+
+    annotated = Event.objects.with_status(now).order_by("pk")
+
+    assert [event.status_code for event in annotated] == [
+        EventStatus.PAST,
+        EventStatus.FUTURE,
+        EventStatus.CANCELLED,
+    ]
+    assert [event.status for event in annotated] == [
+        event.status for event in Event.objects.order_by("pk")
+    ]
@@ -0,0 +1,93 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+
+def walk_pages(client, url, link="next"):
+    """Follow the pagination links and return every page"""
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.data)
+        url = response.data[link]
+    return pages
+
+
+@pytest.mark.django_db
+def test_event_list_pages_are_keyset_ordered(api_client, create_event):
+    """Test every event is listed exactly once, ordered by (start_date, id)"""
+    start_date = timezone.now() + timezone.timedelta(days=1)
+    # Events sharing a start_date are ordered by id.
+    later = [
+        create_event(start_date=start_date + timezone.timedelta(hours=1))
+        for _ in range(3)
+    ]
+    earlier = [create_event(start_date=start_date) for _ in range(4)]
+
+    url = reverse("events-list-create") + "?page_size=2"
+    pages = walk_pages(api_client, url)
+
+    assert [len(page["results"]) for page in pages] == [2, 2, 2, 1]
+    assert pages[0]["previous"] is None
+    ids = [item["id"] for page in pages for item in page["results"]]
+    assert ids == [event.pk for event in earlier + later]
+
+
+@pytest.mark.django_db
+def test_event_list_previous_link(api_client, create_event):
+    """Test the previous link returns to the preceding page"""
+    events = [create_event() for _ in range(5)]
+
+    url = reverse("events-list-create") + "?page_size=2"
+    first_page = api_client.get(url).data
+    second_page = api_client.get(first_page["next"]).data
+    back_page = api_client.get(second_page["previous"]).data
+
+    assert [item["id"] for item in second_page["results"]] == [
+        event.pk for event in events[2:4]
+    ]
+    assert back_page["results"] == first_page["results"]
+    assert back_page["previous"] is None
+
+
+@pytest.mark.django_db
+def test_event_list_filters_apply_across_pages(api_client, create_event):
+    """Test query filters are kept in the cursor links"""
+    concerts = [create_event(event_type="Concert") for _ in range(3)]
+    for _ in range(3):
+        create_event(event_type="Meeting")
+
+    url = reverse("events-list-create") + "?event_type=Concert&page_size=2"
+    pages = walk_pages(api_client, url)
+
+    assert "event_type=Concert" in pages[0]["next"]
+    ids = [item["id"] for page in pages for item in page["results"]]
+    assert ids == [event.pk for event in concerts]
+
+
+@pytest.mark.django_db
+def test_event_list_page_query_count(
+    api_client, create_event, django_assert_num_queries
+):
+    """Test a deep page costs the same queries as the first page"""
+    for _ in range(10):
+        create_event()
+
+    url = reverse("events-list-create") + "?page_size=2"
+    pages = walk_pages(api_client, url)
+    cache.clear()
+    # The page, the ETag needs no query
+    with django_assert_num_queries(1):
+        api_client.get(pages[3]["next"])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("cursor", ["not-base64", "cD1bIjEiXQ=="])
+def test_event_list_invalid_cursor(api_client, cursor):
+    """Test malformed cursors are rejected"""
+    url = reverse("events-list-create") + f"?cursor={cursor}"
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,145 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from events import search
+
+
+@pytest.mark.django_db
+def test_search_ranks_name_matches_first(api_client, create_event):
+    in_description = create_event(
+        name="Tasting", description="Try wines from all over Portugal"
+    )
+    in_name = create_event(description="Try the best of the Douro")
+    create_event(name="Jazz night", description="Live music")
+
+    response = api_client.get(reverse("events-list-create"), {"q": "wines"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.data["results"]] == [
+        in_name.pk,
+        in_description.pk,
+    ]
+
+
+@pytest.mark.django_db
+def test_search_matches_every_word(api_client, create_event):
+    event = create_event()
+    create_event(description="Try wines from all over Spain")
+
+    response = api_client.get(reverse("events-list-create"), {"q": "wine portugal"})
+
+    assert [item["id"] for item in response.data["results"]] == [event.pk]
+
+
+@pytest.mark.django_db
+def test_search_follows_updates(
+    api_client, create_event, django_capture_on_commit_callbacks
+):
+    event = create_event()
+    event.name = "Jazz night"
+    with django_capture_on_commit_callbacks(execute=True):
+        event.save()
+    url = reverse("events-list-create")
+
+    assert api_client.get(url, {"q": "jazz"}).data["results"][0]["id"] == event.pk
+
+    with django_capture_on_commit_callbacks(execute=True):
+        event.delete()
+    assert api_client.get(url, {"q": "jazz"}).data["results"] == []
+
+
+@pytest.mark.django_db
+def test_search_paginates_by_rank(api_client, create_event):
+    """Test the cursor walks the ranked results without gaps or repeats"""
+    events = [
+        create_event(name=f"Wine tasting {index}", description="Wine " * (index + 1))
+        for index in range(5)
+    ]
+
+    url = reverse("events-list-create") + "?q=wine&page_size=2"
+    seen = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        seen.extend(item["id"] for item in response.data["results"])
+        url = response.data["next"]
+
+    assert sorted(seen) == sorted(event.pk for event in events)
+    assert len(seen) == len(events)
+
+
+@pytest.mark.django_db
+def test_search_with_other_filters(api_client, create_event, valid_user):
+    event = create_event(description="Portugal")
+    create_event(description="Spain", active=False)
+
+    response = api_client.get(
+        reverse("events-list-create"), {"q": "wine", "status": "future"}
+    )
+
+    assert [item["id"] for item in response.data["results"]] == [event.pk]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("text", ["", "   "])
+def test_search_without_words(api_client, text):
+    response = api_client.get(reverse("events-list-create"), {"q": text})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["error"] == "Invalid value for 'q' parameter"
+
+
+@pytest.mark.django_db
+def test_search_escapes_query_syntax(api_client, create_event):
+    create_event(description="Portugal")
+
+    response = api_client.get(reverse("events-list-create"), {"q": 'wine" OR NEAR('})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == []
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite FTS5 triggers")
+@pytest.mark.django_db
+def test_search_triggers_are_reinstalled(api_client, create_event):
+    """Test a migrate restores the triggers dropped when SQLite rebuilds the table"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TRIGGER {search.FTS_TABLE}_insert")
+    event = create_event(description="Portugal")
+
+    search.install_sqlite_search(sender=None, using=connection.alias)
+
+    response = api_client.get(reverse("events-list-create"), {"q": "wine"})
+    assert [item["id"] for item in response.data["results"]] == [event.pk]
+
+
+def search_schema():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE %s",
+            [f"{search.FTS_TABLE}%"],
+        )
+        return {name for (name,) in cursor.fetchall()}
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite FTS5 triggers")
+@pytest.mark.django_db(transaction=True)
+def test_search_schema_follows_partial_migrates():
+    """Test migrates of another app or of events to zero run without events_event"""
+    call_command("migrate", "events", "zero", verbosity=0)
+    try:
+        assert search_schema() == set()
+        call_command("migrate", "users", verbosity=0)
+        assert search_schema() == set()
+    finally:
+        call_command("migrate", verbosity=0)
+
+    assert {
+        search.FTS_TABLE,
+        f"{search.FTS_TABLE}_insert",
+        f"{search.FTS_TABLE}_delete",
+        f"{search.FTS_TABLE}_update",
+    } <= search_schema()
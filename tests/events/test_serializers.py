@@ -3,11 +3,15 @@ from django.contrib.auth import get_user_model
 from django.http import HttpRequest
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
+from rest_framework.renderers import JSONRenderer
 
 from events.models import Event
-from events.serializers import (EventDetailUpdateSerializer,
-                                EventListCreateSerializer,
-                                EventSubscribeSerializer)
+from events.serializers import (
+    EventDetailUpdateSerializer,
+    EventListCreateSerializer,
+    EventListValuesSerializer,
+    EventSubscribeSerializer,
+)
 
 User = get_user_model()
 
@@ -48,8 +52,10 @@ def test_event_create_serializer_with_valid_data(valid_user):
             {
                 "name": "Wine tasting",
                 "description": "Try wines from all over Portugal",
-                "start_date": timezone.now(),
-                "end_date": timezone.now() - timezone.timedelta(hours=5),
+                # The payloads are built at collection time, so a start date
+                # of now would be in the past by the time the test runs.
+                "start_date": timezone.now() + timezone.timedelta(days=1),
+                "end_date": timezone.now() + timezone.timedelta(hours=5),
                 "event_type": "Meeting",
             },
             "end_date",
@@ -124,7 +130,7 @@ def test_event_detail_serializer(valid_user):
         event_type=event_type,
     )
     event.list_of_attendees.set([valid_user])
-    serializer = EventDetailUpdateSerializer(event)
+    serializer = EventDetailUpdateSerializer(event, context={"expand": {"attendees"}})
     data = serializer.data
     assert data["name"] == name
     assert data["owner"] == owner.pk
@@ -197,3 +203,37 @@ def test_event_subscribe_serializer(valid_user):
     assert serializer.save()
 
     assert instance.list_of_attendees.first().pk == valid_user.pk
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("time_zone", ["UTC", "America/Sao_Paulo"])
+def test_event_list_values_serializer_matches_list_serializer(valid_user, time_zone):
+    now = timezone.now()
+    for index, (start_date, active) in enumerate(
+        [
+            (now - timezone.timedelta(days=2), True),
+            (now + timezone.timedelta(days=2), True),
+            (now + timezone.timedelta(days=3), False),
+        ]
+    ):
+        event = Event.objects.create(
+            name=f"Wine tasting {index}",
+            owner=valid_user,
+            description="Try wines from all over Portugal \u2028",
+            start_date=start_date,
+            end_date=start_date + timezone.timedelta(hours=5),
+            event_type="Meeting",
+            maximum_attendees=10 + index,
+            active=active,
+        )
+        event.list_of_attendees.add(valid_user)
+
+    queryset = Event.objects.order_by("pk")
+    with timezone.override(time_zone):
+        expected = EventListCreateSerializer(queryset.with_status(), many=True).data
+        data = EventListValuesSerializer(
+            EventListValuesSerializer.get_rows(queryset), many=True
+        ).data
+
+    assert data == expected
+    assert JSONRenderer().render(data) == JSONRenderer().render(expected)
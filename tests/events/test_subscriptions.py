@@ -0,0 +1,473 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events import subscriptions
+from events.models import Event
+from events.serializers import EventDetailUpdateSerializer
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_subscribe_increments_attendee_count(create_event, valid_user):
+    event = create_event()
+
+    assert subscriptions.subscribe(event.pk, valid_user.pk) == subscriptions.SUBSCRIBED
+
+    event.refresh_from_db()
+    assert event.attendee_count == 1
+    assert list(event.list_of_attendees.all()) == [valid_user]
+
+
+@pytest.mark.django_db
+def test_subscribe_twice(create_event, valid_user):
+    event = create_event()
+    subscriptions.subscribe(event.pk, valid_user.pk)
+
+    outcome = subscriptions.subscribe(event.pk, valid_user.pk)
+
+    assert outcome == subscriptions.ALREADY_SUBSCRIBED
+    event.refresh_from_db()
+    assert event.attendee_count == 1
+
+
+@pytest.mark.django_db
+def test_subscribe_full_event(create_event, create_users):
+    event = create_event(maximum_attendees=2)
+    first, second, third = create_users(3)
+    subscriptions.subscribe(event.pk, first.pk)
+    subscriptions.subscribe(event.pk, second.pk)
+
+    outcome = subscriptions.subscribe(event.pk, third.pk)
+
+    assert outcome == subscriptions.WAITLISTED
+    event.refresh_from_db()
+    assert event.attendee_count == 2
+    assert not event.list_of_attendees.filter(pk=third.pk).exists()
+    assert list(event.waitlist.values_list("user_id", flat=True)) == [third.pk]
+
+
+@pytest.mark.django_db
+def test_subscribe_with_stale_event(create_event, create_users):
+    """Test the capacity check reads the database, not the loaded event"""
+    event = create_event(maximum_attendees=1)
+    stale_event = Event.objects.get(pk=event.pk)
+    first, second = create_users(2)
+    subscriptions.subscribe(event.pk, first.pk)
+
+    assert stale_event.attendee_count == 0
+    assert (
+        subscriptions.subscribe(stale_event.pk, second.pk) == subscriptions.WAITLISTED
+    )
+
+
+@pytest.mark.django_db
+def test_unsubscribe_decrements_attendee_count(create_event, valid_user):
+    event = create_event()
+    subscriptions.subscribe(event.pk, valid_user.pk)
+
+    outcome = subscriptions.unsubscribe(event.pk, valid_user.pk)
+
+    assert outcome == subscriptions.UNSUBSCRIBED
+    event.refresh_from_db()
+    assert event.attendee_count == 0
+    assert not event.list_of_attendees.exists()
+
+
+@pytest.mark.django_db
+def test_unsubscribe_twice(create_event, valid_user):
+    event = create_event()
+
+    outcome = subscriptions.unsubscribe(event.pk, valid_user.pk)
+
+    assert outcome == subscriptions.NOT_SUBSCRIBED
+    event.refresh_from_db()
+    assert event.attendee_count == 0
+
+
+@pytest.mark.django_db
+def test_subscribe_view_keeps_updated_date(create_event, valid_user):
+    """Test subscribing does not rewrite the event row"""
+    event = create_event()
+    client = APIClient()
+    client.force_authenticate(valid_user)
+
+    client.put(reverse("events-subscribe", kwargs={"pk": event.pk}))
+    client.put(reverse("events-unsubscribe", kwargs={"pk": event.pk}))
+
+    assert Event.objects.get(pk=event.pk).updated_date == event.updated_date
+
+
+@pytest.mark.django_db
+def test_event_update_keeps_attendee_count(create_event, valid_user):
+    """Test an edit of an instance loaded before a subscribe keeps the new count"""
+    event = create_event(maximum_attendees=1)
+    loaded = Event.objects.get(pk=event.pk)
+    subscriptions.subscribe(event.pk, valid_user.pk)
+
+    serializer = EventDetailUpdateSerializer(
+        loaded, data={"name": "Port tasting"}, partial=True
+    )
+    assert serializer.is_valid(), serializer.errors
+    serializer.save()
+
+    event.refresh_from_db()
+    assert event.name == "Port tasting"
+    assert event.attendee_count == 1
+    assert event.attendees_updated_date is not None
+    other = User.objects.create_user(email="other@example.com")
+    assert subscriptions.subscribe(event.pk, other.pk) == subscriptions.WAITLISTED
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["events-subscribe", "events-unsubscribe"])
+def test_subscribe_view_queries_do_not_grow_with_attendees(
+    create_event, create_users, valid_user, url_name
+):
+    """Test subscribe and unsubscribe cost the same for small and large events"""
+    small_event = create_event()
+    large_event = create_event(maximum_attendees=200)
+    large_event.list_of_attendees.add(*create_users(100))
+    client = APIClient()
+    client.force_authenticate(valid_user)
+
+    query_counts = []
+    for event in (small_event, large_event):
+        if url_name == "events-unsubscribe":
+            subscriptions.subscribe(event.pk, valid_user.pk)
+        with CaptureQueriesContext(connection) as context:
+            response = client.put(reverse(url_name, kwargs={"pk": event.pk}))
+        assert response.status_code == status.HTTP_200_OK
+        query_counts.append(len(context.captured_queries))
+        # Attendee rows are only ever looked up for the requesting user.
+        through_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if subscriptions.Attendance._meta.db_table in query["sql"]
+            and not query["sql"].startswith("INSERT")
+        ]
+        assert all('"user_id" =' in sql for sql in through_queries)
+
+    assert query_counts[0] == query_counts[1]
+
+
+@pytest.mark.django_db
+def test_subscribe_view_full_event(create_event, valid_user):
+    event = create_event(maximum_attendees=0)
+    client = APIClient()
+    client.force_authenticate(valid_user)
+
+    response = client.put(reverse("events-subscribe", kwargs={"pk": event.pk}))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["message"] == "Event is full, added to the waitlist"
+    assert event.waitlist.filter(user=valid_user).exists()
+
+
+@pytest.mark.django_db
+def test_attendee_count_follows_orm_changes(create_event, create_users):
+    event = create_event()
+    first, second = create_users(2)
+
+    event.list_of_attendees.add(first, second)
+    assert event.attendee_count == 2
+
+    event.list_of_attendees.remove(first)
+    assert event.attendee_count == 1
+
+    second.attendees.clear()
+    event.refresh_from_db()
+    assert event.attendee_count == 0
+
+    first.attendees.add(event)
+    event.refresh_from_db()
+    assert event.attendee_count == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_subscribe_holds_capacity(
+    create_event, create_users, serialized_writers
+):
+    """Test 200 concurrent subscribes fill the event exactly to capacity"""
+    event = create_event(maximum_attendees=50)
+    users = create_users(200)
+    url = reverse("events-subscribe", kwargs={"pk": event.pk})
+
+    def subscribe(user):
+        client = APIClient()
+        client.force_authenticate(user)
+        try:
+            return client.put(url).status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=200) as executor:
+        status_codes = list(executor.map(subscribe, users))
+
+    event.refresh_from_db()
+    assert status_codes.count(status.HTTP_200_OK) == 200
+    assert event.attendee_count == 50
+    assert event.list_of_attendees.count() == 50
+    assert event.waitlist.count() == 150
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_unsubscribe_promotes_waitlist(
+    create_event, create_users, serialized_writers
+):
+    """Test seats released concurrently go to the waitlist in order, never over capacity"""
+    event = create_event(maximum_attendees=50)
+    attendees = create_users(50)
+    waiting = create_users(100, prefix="waiting")
+    for user in attendees + waiting:
+        subscriptions.subscribe(event.pk, user.pk)
+    late = create_users(30, prefix="late")
+
+    def run(action, user):
+        try:
+            return action(event.pk, user.pk)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=60) as executor:
+        leaving = [
+            executor.submit(run, subscriptions.unsubscribe, user)
+            for user in attendees[:30]
+        ]
+        joining = [executor.submit(run, subscriptions.subscribe, user) for user in late]
+    assert {future.result() for future in leaving} == {subscriptions.UNSUBSCRIBED}
+    assert {future.result() for future in joining} == {subscriptions.WAITLISTED}
+
+    event.refresh_from_db()
+    assert event.attendee_count == 50
+    assert set(event.list_of_attendees.values_list("pk", flat=True)) == {
+        user.pk for user in attendees[30:] + waiting[:30]
+    }
+    assert event.waitlist.count() == 100
+
+
+@pytest.mark.django_db
+def test_unsubscribe_promotes_waitlist_in_order(create_event, create_users):
+    event = create_event(maximum_attendees=1)
+    attendee, first, second = create_users(3)
+    subscriptions.subscribe(event.pk, attendee.pk)
+    subscriptions.subscribe(event.pk, first.pk)
+    subscriptions.subscribe(event.pk, second.pk)
+
+    assert (
+        subscriptions.unsubscribe(event.pk, attendee.pk) == subscriptions.UNSUBSCRIBED
+    )
+
+    event.refresh_from_db()
+    assert event.attendee_count == 1
+    assert list(event.list_of_attendees.all()) == [first]
+    assert list(event.waitlist.values_list("user_id", flat=True)) == [second.pk]
+
+
+@pytest.mark.django_db
+def test_waitlist_twice_and_leave(create_event, valid_user):
+    event = create_event(maximum_attendees=0)
+
+    assert subscriptions.subscribe(event.pk, valid_user.pk) == subscriptions.WAITLISTED
+    outcome = subscriptions.subscribe(event.pk, valid_user.pk)
+    assert outcome == subscriptions.ALREADY_WAITLISTED
+
+    outcome = subscriptions.unsubscribe(event.pk, valid_user.pk)
+    assert outcome == subscriptions.LEFT_WAITLIST
+    outcome = subscriptions.unsubscribe(event.pk, valid_user.pk)
+    assert outcome == subscriptions.NOT_SUBSCRIBED
+    assert not event.waitlist.exists()
+
+
+@pytest.mark.django_db
+def test_subscribe_full_event_as_attendee(create_event, valid_user):
+    event = create_event(maximum_attendees=1)
+    subscriptions.subscribe(event.pk, valid_user.pk)
+
+    outcome = subscriptions.subscribe(event.pk, valid_user.pk)
+
+    assert outcome == subscriptions.ALREADY_SUBSCRIBED
+    assert not event.waitlist.exists()
+
+
+@pytest.mark.django_db
+def test_larger_capacity_promotes_waitlist(create_event, create_users, valid_user):
+    event = create_event(maximum_attendees=0)
+    first, second, third = create_users(3)
+    for user in (first, second, third):
+        subscriptions.subscribe(event.pk, user.pk)
+    client = APIClient()
+    client.force_authenticate(valid_user)
+
+    response = client.patch(
+        reverse("events-detail-update", kwargs={"pk": event.pk}),
+        {"maximum_attendees": 2},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["number_of_attendees"] == 2
+    assert set(event.list_of_attendees.all()) == {first, second}
+    assert list(event.waitlist.values_list("user_id", flat=True)) == [third.pk]
+
+
+@pytest.mark.django_db
+def test_unsubscribe_view_leaves_waitlist(create_event, valid_user):
+    event = create_event(maximum_attendees=0)
+    subscriptions.subscribe(event.pk, valid_user.pk)
+    client = APIClient()
+    client.force_authenticate(valid_user)
+
+    response = client.put(reverse("events-unsubscribe", kwargs={"pk": event.pk}))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["message"] == "Removed from the waitlist"
+
+
+@pytest.mark.django_db
+def test_subscribe_users_hands_out_remaining_seats(
+    create_event, create_users, valid_user
+):
+    event = create_event(maximum_attendees=3)
+    first, second, third = create_users(3)
+    subscriptions.subscribe(event.pk, valid_user.pk)
+
+    outcomes = subscriptions.subscribe_users(
+        event.pk, [valid_user.pk, first.pk, 9999, second.pk, third.pk, first.pk]
+    )
+
+    assert outcomes == {
+        valid_user.pk: subscriptions.ALREADY_SUBSCRIBED,
+        first.pk: subscriptions.SUBSCRIBED,
+        9999: subscriptions.NOT_FOUND,
+        second.pk: subscriptions.SUBSCRIBED,
+        third.pk: subscriptions.FULL,
+    }
+    event.refresh_from_db()
+    assert event.attendee_count == 3
+    assert set(event.list_of_attendees.values_list("pk", flat=True)) == {
+        valid_user.pk,
+        first.pk,
+        second.pk,
+    }
+
+
+@pytest.mark.django_db
+def test_subscribe_users_queries_do_not_grow_with_users(create_event, create_users):
+    """Test the batch costs the same number of queries for 2 and 50 users"""
+    query_counts = []
+    for count in (2, 50):
+        event = create_event()
+        users = create_users(count, prefix=f"batch{count}-")
+        with CaptureQueriesContext(connection) as context:
+            subscriptions.subscribe_users(event.pk, [user.pk for user in users])
+        query_counts.append(len(context.captured_queries))
+        event.refresh_from_db()
+        assert event.attendee_count == count
+
+    assert query_counts[0] == query_counts[1]
+
+
+@pytest.mark.django_db
+def test_subscribe_to_events(create_event, valid_user):
+    subscribed, full, available = (
+        create_event(),
+        create_event(maximum_attendees=0),
+        create_event(),
+    )
+    subscriptions.subscribe(subscribed.pk, valid_user.pk)
+
+    outcomes = subscriptions.subscribe_to_events(
+        valid_user.pk, [subscribed.pk, full.pk, available.pk, 9999]
+    )
+
+    assert outcomes == {
+        subscribed.pk: subscriptions.ALREADY_SUBSCRIBED,
+        full.pk: subscriptions.FULL,
+        available.pk: subscriptions.SUBSCRIBED,
+        9999: subscriptions.NOT_FOUND,
+    }
+    available.refresh_from_db()
+    full.refresh_from_db()
+    assert available.attendee_count == 1
+    assert full.attendee_count == 0
+
+
+@pytest.mark.django_db
+def test_bulk_subscribe_view(create_event, create_users, valid_user):
+    event = create_event(maximum_attendees=1)
+    first, second = create_users(2)
+    client = APIClient()
+    client.force_authenticate(valid_user)
+
+    response = client.post(
+        reverse("events-bulk-subscribe", kwargs={"pk": event.pk}),
+        {"users": [first.pk, second.pk]},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == [
+        {"user": first.pk, "result": subscriptions.SUBSCRIBED},
+        {"user": second.pk, "result": subscriptions.FULL},
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_subscribe_view_without_obj_owner(create_event, create_users):
+    event = create_event()
+    (other,) = create_users(1)
+    client = APIClient()
+    client.force_authenticate(other)
+
+    response = client.post(
+        reverse("events-bulk-subscribe", kwargs={"pk": event.pk}),
+        {"users": [other.pk]},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert Event.objects.get(pk=event.pk).attendee_count == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("payload", [{}, {"users": []}, {"users": ["a"]}])
+def test_bulk_subscribe_view_with_invalid_payload(create_event, valid_user, payload):
+    event = create_event()
+    client = APIClient()
+    client.force_authenticate(valid_user)
+
+    response = client.post(
+        reverse("events-bulk-subscribe", kwargs={"pk": event.pk}),
+        payload,
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_subscribe_bulk_view(create_event, valid_user):
+    first, second = create_event(), create_event(maximum_attendees=0)
+    client = APIClient()
+    client.force_authenticate(valid_user)
+
+    response = client.post(
+        reverse("events-subscribe-bulk"),
+        {"events": [first.pk, second.pk]},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == [
+        {"event": first.pk, "result": subscriptions.SUBSCRIBED},
+        {"event": second.pk, "result": subscriptions.FULL},
+    ]
+    assert first.list_of_attendees.filter(pk=valid_user.pk).exists()
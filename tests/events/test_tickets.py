@@ -0,0 +1,171 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events import subscriptions, tickets
+from events.models import SubscriptionTicket
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_request_subscription_twice_returns_pending_ticket(create_event, valid_user):
+    event = create_event()
+
+    first = tickets.request_subscription(event.pk, valid_user.pk)
+    second = tickets.request_subscription(event.pk, valid_user.pk)
+
+    assert first.pk == second.pk
+    assert first.status == SubscriptionTicket.PENDING
+
+
+@pytest.mark.django_db
+def test_request_subscription_after_decided_ticket(create_event, valid_user):
+    event = create_event()
+    first = tickets.request_subscription(event.pk, valid_user.pk)
+    tickets.process_tickets(10)
+
+    second = tickets.request_subscription(event.pk, valid_user.pk)
+
+    assert second.pk != first.pk
+    tickets.process_tickets(10)
+    second.refresh_from_db()
+    assert second.status == subscriptions.ALREADY_SUBSCRIBED
+
+
+@pytest.mark.django_db
+def test_process_tickets_fills_capacity_then_waitlist(create_event, create_users):
+    event = create_event(maximum_attendees=2)
+    users = create_users(4)
+    requested = [tickets.request_subscription(event.pk, user.pk) for user in users]
+
+    assert tickets.process_tickets(10) == 4
+
+    statuses = [
+        SubscriptionTicket.objects.get(pk=ticket.pk).status for ticket in requested
+    ]
+    assert statuses == [
+        subscriptions.SUBSCRIBED,
+        subscriptions.SUBSCRIBED,
+        subscriptions.WAITLISTED,
+        subscriptions.WAITLISTED,
+    ]
+    event.refresh_from_db()
+    assert event.attendee_count == 2
+    assert list(
+        event.waitlist.order_by("created_date", "id").values_list("user_id", flat=True)
+    ) == [
+        users[2].pk,
+        users[3].pk,
+    ]
+    assert not SubscriptionTicket.objects.filter(processed_date=None).exists()
+
+
+@pytest.mark.django_db
+def test_process_tickets_in_batches_over_events(create_event, create_users):
+    first, second = create_event(), create_event()
+    users = create_users(3)
+    for user in users:
+        tickets.request_subscription(first.pk, user.pk)
+        tickets.request_subscription(second.pk, user.pk)
+
+    assert tickets.process_tickets(4) == 4
+    assert SubscriptionTicket.objects.filter(status="pending").count() == 2
+    assert tickets.process_tickets(4) == 2
+    assert tickets.process_tickets(4) == 0
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.attendee_count == second.attendee_count == 3
+
+
+@pytest.mark.django_db
+def test_process_tickets_queries_do_not_grow_with_batch(create_event, create_users):
+    """Test a batch on one event costs the same number of queries for 2 and 50 tickets"""
+    query_counts = []
+    for count in (2, 50):
+        event = create_event(maximum_attendees=count // 2)
+        for user in create_users(count, prefix=f"batch{count}-"):
+            tickets.request_subscription(event.pk, user.pk)
+        with CaptureQueriesContext(connection) as context:
+            tickets.process_tickets(100)
+        query_counts.append(len(context.captured_queries))
+
+    assert query_counts[0] == query_counts[1]
+
+
+@pytest.mark.django_db
+def test_process_subscription_tickets_command(create_event, create_users):
+    event = create_event()
+    for user in create_users(5):
+        tickets.request_subscription(event.pk, user.pk)
+
+    call_command("process_subscription_tickets", "--once", "--batch-size", "2")
+
+    assert not SubscriptionTicket.objects.filter(status="pending").exists()
+    event.refresh_from_db()
+    assert event.attendee_count == 5
+
+
+@pytest.mark.django_db
+@override_settings(EVENTS_SUBSCRIBE_QUEUE=True)
+def test_queued_subscribe_view(create_event, valid_user):
+    event = create_event()
+    client = APIClient()
+    client.force_authenticate(valid_user)
+
+    response = client.put(reverse("events-subscribe", kwargs={"pk": event.pk}))
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["message"] == "Subscription queued"
+    ticket_url = reverse(
+        "events-subscription-ticket", kwargs={"pk": response.data["ticket"]}
+    )
+    assert response["Location"] == ticket_url
+    assert client.get(ticket_url).data["status"] == SubscriptionTicket.PENDING
+    assert not event.list_of_attendees.exists()
+
+    tickets.process_tickets(10)
+
+    response = client.get(ticket_url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["status"] == subscriptions.SUBSCRIBED
+    assert response.data["processed_date"]
+    assert event.list_of_attendees.filter(pk=valid_user.pk).exists()
+
+
+@pytest.mark.django_db
+@override_settings(EVENTS_SUBSCRIBE_QUEUE=True)
+def test_queued_unsubscribe_view_cancels_ticket(create_event, valid_user):
+    event = create_event()
+    client = APIClient()
+    client.force_authenticate(valid_user)
+    ticket = tickets.request_subscription(event.pk, valid_user.pk)
+
+    response = client.put(reverse("events-unsubscribe", kwargs={"pk": event.pk}))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["message"] == "Subscription request cancelled"
+    ticket.refresh_from_db()
+    assert ticket.status == SubscriptionTicket.CANCELLED
+    assert tickets.process_tickets(10) == 0
+
+
+@pytest.mark.django_db
+def test_ticket_of_other_user_not_found(create_event, create_users, valid_user):
+    (other,) = create_users(1)
+    ticket = tickets.request_subscription(create_event().pk, other.pk)
+    client = APIClient()
+    client.force_authenticate(valid_user)
+
+    response = client.get(
+        reverse("events-subscription-ticket", kwargs={"pk": ticket.pk})
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -1,10 +1,23 @@
+import csv
+import io
+import json
+
 import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from events import subscriptions
+from events.models import Event
+
+User = get_user_model()
+
 valid_payload = {
     "name": "Wine tasting",
     "description": "Try wines from all over Portugal",
@@ -109,7 +122,121 @@ def test_event_list(api_client, event_create_with_login):
     response = api_client.get(url)
     # we are not testing the format for now, this might be required in production
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) == 2
+    assert len(response.data["results"]) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("number_of_events", [1, 25])
+def test_event_list_query_count(
+    api_client, valid_user, django_assert_num_queries, number_of_events
+):
+    """Test event list costs a single query however many events are listed"""
+    for _ in range(number_of_events):
+        event = Event.objects.create(owner=valid_user, **valid_payload)
+        event.list_of_attendees.add(valid_user)
+
+    url = reverse("events-list-create")
+    # The page, the ETag needs no query
+    with django_assert_num_queries(1):
+        response = api_client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == number_of_events
+    assert all(item["number_of_attendees"] == 1 for item in response.data["results"])
+
+
+@pytest.mark.django_db
+def test_event_list_filters_single_query(
+    api_client, valid_user, django_assert_num_queries
+):
+    """Test several filters are combined into one query per statement"""
+    event = Event.objects.create(owner=valid_user, **valid_payload)
+    Event.objects.create(owner=valid_user, **{**valid_payload, "name": "Beer tasting"})
+
+    url = reverse("events-list-create")
+    params = {
+        "name": "wine",
+        "description": "portugal",
+        "event_type": "meet",
+        "owner": valid_user.pk,
+        "status": "future",
+    }
+    # The page, the ETag needs no query
+    with django_assert_num_queries(1):
+        response = api_client.get(url, params)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.data["results"]] == [event.pk]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "status_code, expected_names",
+    [
+        ["future", ["Upcoming"]],
+        ["past", ["Ongoing", "Finished"]],
+        ["cancelled", ["Cancelled"]],
+    ],
+)
+def test_event_list_status_filter(api_client, valid_user, status_code, expected_names):
+    """Test the status filter selects the events displayed with that status_code"""
+    now = timezone.now()
+    hour = timezone.timedelta(hours=1)
+    for name, start_date, active in [
+        ("Finished", now - 3 * hour, True),
+        ("Ongoing", now - hour, True),
+        ("Upcoming", now + hour, True),
+        ("Cancelled", now + 2 * hour, False),
+    ]:
+        end_date = now - 2 * hour if name == "Finished" else now + 3 * hour
+        Event.objects.create(
+            **{
+                **valid_payload,
+                "name": name,
+                "start_date": start_date,
+                "end_date": end_date,
+                "active": active,
+            },
+            owner=valid_user,
+        )
+
+    url = reverse("events-list-create")
+    response = api_client.get(url, {"status": status_code})
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.data["results"]
+    assert sorted(item["name"] for item in results) == sorted(expected_names)
+    assert all(item["status_code"] == status_code for item in results)
+
+
+@pytest.mark.django_db
+def test_event_list_filter_without_match(api_client, valid_user):
+    """Test a filter matching nothing returns an empty page"""
+    Event.objects.create(owner=valid_user, **valid_payload)
+
+    url = reverse("events-list-create")
+    response = api_client.get(url, {"name": "opera"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params, expected_error",
+    [
+        [{"colour": "red"}, "Invalid filter parameter 'colour'"],
+        [{"status": "someday"}, "Invalid value for 'status' parameter"],
+        [{"owner": "me"}, "Invalid value for 'owner' parameter"],
+    ],
+)
+def test_event_list_invalid_filter(api_client, params, expected_error):
+    """Test unknown params and malformed values are rejected"""
+    url = reverse("events-list-create")
+    response = api_client.get(url, params)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["error"] == expected_error
 
 
 @pytest.mark.django_db
@@ -128,12 +255,90 @@ def test_event_details(api_client, event_create_with_login):
     assert parse_datetime(data["start_date"]) == valid_payload["start_date"]
     assert parse_datetime(data["end_date"]) == valid_payload["end_date"]
     assert data["event_type"] == valid_payload["event_type"]
-    assert data["list_of_attendees"] == []
+    assert "list_of_attendees" not in data
+    assert data["number_of_attendees"] == 0
     assert data["created_date"]
     assert data["updated_date"]
     assert data["status"]
 
 
+@pytest.mark.django_db
+def test_event_details_expand_attendees(api_client, valid_user):
+    event = Event.objects.create(owner=valid_user, **valid_payload)
+    event.list_of_attendees.add(valid_user)
+
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    response = api_client.get(url, {"expand": "attendees"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["list_of_attendees"] == [valid_user.pk]
+
+
+@pytest.mark.django_db
+def test_event_details_queries_do_not_grow_with_attendees(
+    api_client, valid_user, django_assert_num_queries
+):
+    """Test the detail view does not read attendees unless expanded"""
+    event = Event.objects.create(owner=valid_user, **valid_payload)
+    event.list_of_attendees.add(valid_user)
+
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    with django_assert_num_queries(1):
+        response = api_client.get(url)
+    assert response.data["number_of_attendees"] == 1
+
+
+@pytest.mark.django_db
+def test_event_attendees(api_client, valid_user):
+    """Test the attendees endpoint walks every attendee once, by cursor"""
+    event = Event.objects.create(owner=valid_user, **valid_payload)
+    attendees = User.objects.bulk_create(
+        User(email=f"attendee{index}@example.com") for index in range(5)
+    )
+    event.list_of_attendees.add(*attendees)
+
+    url = reverse("events-attendees", kwargs={"pk": event.pk}) + "?page_size=2"
+    ids = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        ids += [attendee["id"] for attendee in response.data["results"]]
+        url = response.data["next"]
+
+    assert ids == [attendee.pk for attendee in attendees]
+
+
+@pytest.mark.django_db
+def test_event_attendees_in_signup_order(api_client, valid_user):
+    """Test attendees are listed by subscription time, not by user id"""
+    event = Event.objects.create(owner=valid_user, **valid_payload)
+    attendees = User.objects.bulk_create(
+        User(email=f"attendee{index}@example.com") for index in range(3)
+    )
+    for attendee in reversed(attendees):
+        subscriptions.subscribe(event.pk, attendee.pk)
+
+    url = reverse("events-attendees", kwargs={"pk": event.pk}) + "?page_size=2"
+    results = []
+    while url:
+        response = api_client.get(url)
+        results += response.data["results"]
+        url = response.data["next"]
+
+    assert [attendee["id"] for attendee in results] == [
+        attendee.pk for attendee in reversed(attendees)
+    ]
+    subscribed_at = [parse_datetime(attendee["subscribed_at"]) for attendee in results]
+    assert subscribed_at == sorted(subscribed_at)
+
+
+@pytest.mark.django_db
+def test_event_attendees_unknown_event(api_client):
+    url = reverse("events-attendees", kwargs={"pk": 404})
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 @pytest.mark.django_db
 def test_event_update_with_obj_owner(client_with_credentials, event_create_with_login):
     event = event_create_with_login()
@@ -272,3 +477,229 @@ def test_event_unsubscribe_without_login(event_create_with_login, api_client):
     url = reverse("events-unsubscribe", kwargs={"pk": event.data["id"]})
     response = api_client.put(url)
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def bulk_payload(count):
+    return [
+        {**valid_payload, "name": f"Wine tasting {index}"} for index in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_event_bulk_create(client_with_credentials):
+    url = reverse("events-bulk-create")
+    response = client_with_credentials.post(url, data=bulk_payload(3), format="json")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["created"] == 3
+    events = Event.objects.order_by("id")
+    assert list(events.values_list("id", flat=True)) == response.data["ids"]
+    assert [event.name for event in events] == [
+        "Wine tasting 0",
+        "Wine tasting 1",
+        "Wine tasting 2",
+    ]
+    assert all(event.owner.email == "jhon@example.com" for event in events)
+
+
+@pytest.mark.django_db
+@override_settings(EVENTS_BULK_BATCH_SIZE=2)
+def test_event_bulk_create_batches_inserts(client_with_credentials):
+    url = reverse("events-bulk-create")
+    with CaptureQueriesContext(connection) as context:
+        response = client_with_credentials.post(
+            url, data=bulk_payload(5), format="json"
+        )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    inserts = [
+        query for query in context.captured_queries if query["sql"].startswith("INSERT")
+    ]
+    assert len(inserts) == 3
+
+
+@pytest.mark.django_db
+def test_event_bulk_create_reports_errors_by_index(client_with_credentials):
+    payload = bulk_payload(3)
+    payload[1]["end_date"] = valid_payload["start_date"]
+    del payload[2]["name"]
+
+    url = reverse("events-bulk-create")
+    response = client_with_credentials.post(url, data=payload, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["errors"] == {
+        1: {"end_date": ["End date must be greater than start date."]},
+        2: {"name": ["This field is required."]},
+    }
+    assert not Event.objects.exists()
+
+
+@pytest.mark.django_db
+@override_settings(EVENTS_BULK_MAX_SIZE=2)
+def test_event_bulk_create_too_many(client_with_credentials):
+    url = reverse("events-bulk-create")
+    response = client_with_credentials.post(url, data=bulk_payload(3), format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Event.objects.exists()
+
+
+@pytest.mark.django_db
+def test_event_bulk_create_without_login(api_client):
+    url = reverse("events-bulk-create")
+    response = api_client.post(url, data=bulk_payload(1), format="json")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.fixture
+def export_events(valid_user):
+    Event.objects.create(owner=valid_user, **valid_payload)
+    Event.objects.create(
+        owner=valid_user, **{**valid_payload, "name": "Beer tasting", "active": False}
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("export_format", ["json", "ndjson"])
+def test_event_export_matches_list(api_client, export_events, export_format):
+    """Test exported rows are the rows of the event list"""
+    listed = json.loads(api_client.get(reverse("events-list-create")).content)
+
+    url = reverse("events-export-format", kwargs={"export_format": export_format})
+    response = api_client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    content = b"".join(response.streaming_content).decode()
+    if export_format == "json":
+        exported = json.loads(content)
+    else:
+        exported = [json.loads(line) for line in content.splitlines()]
+    assert exported == listed["results"]
+
+
+@pytest.mark.django_db
+def test_event_export_csv(api_client, export_events):
+    url = reverse("events-export-format", kwargs={"export_format": "csv"})
+    response = api_client.get(url, {"status": "cancelled"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "text/csv"
+    rows = list(
+        csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode()))
+    )
+    assert [(row["name"], row["status"]) for row in rows] == [
+        ("Beer tasting", "Cancelled")
+    ]
+
+
+@pytest.mark.django_db
+def test_event_export_reads_in_chunks(api_client, export_events):
+    """Test the export iterates the queryset instead of loading it whole"""
+    with override_settings(EVENTS_EXPORT_CHUNK_SIZE=1):
+        response = api_client.get(reverse("events-export"))
+        lines = [chunk for chunk in response.streaming_content]
+
+    # One chunk per row
+    assert len(lines) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url, expected_status",
+    [
+        ["/api/events/export/?colour=red", status.HTTP_400_BAD_REQUEST],
+        ["/api/events/export/xml/", status.HTTP_404_NOT_FOUND],
+    ],
+)
+def test_event_export_invalid_request(api_client, url, expected_status):
+    response = api_client.get(url)
+
+    assert response.status_code == expected_status
+
+
+@pytest.fixture
+def user_events(client_with_credentials, valid_user):
+    """Events owned by, attended by, or unrelated to the user of client_with_credentials"""
+    user = User.objects.get(email="jhon@example.com")
+    now = timezone.now()
+    events = {}
+    for owner, label, hours in [
+        (user, "owned_future", 2),
+        (user, "owned_later", 3),
+        (user, "owned_past", -2),
+        (valid_user, "attending_future", 1),
+        (valid_user, "attending_past", -1),
+        (valid_user, "other", 4),
+    ]:
+        events[label] = Event.objects.create(
+            owner=owner,
+            **{
+                **valid_payload,
+                "name": label,
+                "start_date": now + timezone.timedelta(hours=hours),
+                "end_date": now + timezone.timedelta(hours=hours + 1),
+            },
+        )
+    for label in ("attending_future", "attending_past"):
+        subscriptions.subscribe(events[label].pk, user.pk)
+    return events
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url_name, names",
+    [
+        ("user-events-owned", ["owned_past", "owned_future", "owned_later"]),
+        ("user-events-attending", ["attending_past", "attending_future"]),
+    ],
+)
+def test_user_events(
+    client_with_credentials, user_events, django_assert_num_queries, url_name, names
+):
+    """Test the user's events come by cursor in start date order, one query per page"""
+    url = reverse(url_name) + "?page_size=2"
+    results = []
+    while url:
+        with django_assert_num_queries(1):
+            response = client_with_credentials.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        results += response.data["results"]
+        url = response.data["next"]
+
+    assert [event["name"] for event in results] == names
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url_name, names",
+    [
+        ("user-events-owned", ["owned_future", "owned_later"]),
+        ("user-events-attending", ["attending_future"]),
+    ],
+)
+def test_user_events_status_filter(
+    client_with_credentials, user_events, url_name, names
+):
+    response = client_with_credentials.get(reverse(url_name), {"status": "future"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [event["name"] for event in response.data["results"]] == names
+    assert all(event["status_code"] == "future" for event in response.data["results"])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["user-events-owned", "user-events-attending"])
+def test_user_events_invalid_filter(client_with_credentials, url_name):
+    response = client_with_credentials.get(reverse(url_name), {"owner": 1})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["user-events-owned", "user-events-attending"])
+def test_user_events_requires_login(api_client, url_name):
+    response = api_client.get(reverse(url_name))
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+SHOW_CONN_MAX_AGE = """
+import events_manager.asgi
+from django.conf import settings
+print(sorted({database["CONN_MAX_AGE"] for database in settings.DATABASES.values()}))
+"""
+
+
+def test_asgi_disables_persistent_connections():
+    """Test the ASGI entry point closes connections after each request"""
+    env = {
+        **os.environ,
+        "DB_NAME": "events",
+        "DB_CONN_MAX_AGE": "60",
+        "DB_REPLICA_HOSTS": "replica1,replica2",
+    }
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+
+    output = subprocess.run(
+        [sys.executable, "-c", SHOW_CONN_MAX_AGE],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.strip() == "[0]"
@@ -0,0 +1,166 @@
+import datetime
+import decimal
+import io
+import uuid
+import zoneinfo
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from events.models import Event
+from events_manager import parsers, renderers
+
+User = get_user_model()
+
+data = {
+    "utc": datetime.datetime(
+        2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+    ),
+    "offset": datetime.datetime(
+        2024, 5, 1, 12, 30, tzinfo=zoneinfo.ZoneInfo("Europe/Lisbon")
+    ),
+    "utc_zone": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=zoneinfo.ZoneInfo("UTC")),
+    "naive": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456),
+    "date": datetime.date(2024, 5, 1),
+    "time": datetime.time(12, 30, 15, 123456),
+    "duration": datetime.timedelta(hours=1),
+    "decimal": decimal.Decimal("12.50"),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "lazy": _("User is inactive"),
+    "error": [ErrorDetail("Invalid value", code="invalid")],
+    "separators": "line\u2028paragraph\u2029 é ✓",
+    1: {"nested": [None, True, False, 0, -1, 2**40, "", []]},
+    "tuple": (1, 2),
+}
+
+
+@pytest.mark.parametrize("value", [data, [data, data], {}, [], "text", 1, None])
+def test_orjson_renderer_matches_json_renderer(value):
+    assert renderers.ORJSONRenderer().render(value) == JSONRenderer().render(value)
+
+
+def test_orjson_renderer_falls_back_without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, "orjson", None)
+
+    assert renderers.ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_orjson_renderer_falls_back_for_indent():
+    media_type = "application/json; indent=4"
+
+    content = renderers.ORJSONRenderer().render(data, media_type)
+
+    assert content == JSONRenderer().render(data, media_type)
+    assert b"\n    " in content
+
+
+def test_orjson_renderer_falls_back_for_big_integers():
+    value = {"big": 2**70}
+
+    assert renderers.ORJSONRenderer().render(value) == JSONRenderer().render(value)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        1e16,
+        1.5e-7,
+        1e-5,
+        -2.5e-5,
+        1.2345678901234568e17,
+        0.0001,
+        1e15,
+        0.1,
+        -0.0,
+        decimal.Decimal("1E+16"),
+        decimal.Decimal("0.00000015"),
+        {"text": "1e16 and 0.00001", "values": [1e22, 3.0]},
+    ],
+)
+def test_orjson_renderer_matches_json_renderer_for_floats(value):
+    assert renderers.ORJSONRenderer().render(value) == JSONRenderer().render(value)
+
+
+@pytest.mark.parametrize(
+    "value", [float("nan"), [float("inf")], {"value": decimal.Decimal("NaN")}]
+)
+def test_orjson_renderer_rejects_non_finite_floats(value):
+    with pytest.raises(ValueError):
+        JSONRenderer().render(value)
+    with pytest.raises(ValueError):
+        renderers.ORJSONRenderer().render(value)
+
+
+@pytest.mark.django_db
+def test_event_list_response_matches_json_renderer():
+    user = User.objects.create_user(email="owner@example.com", password="password")
+    Event.objects.create(
+        owner=user,
+        name="Wine tasting ✓",
+        description="Try wines from all over Portugal",
+        start_date=timezone.now() + timezone.timedelta(hours=1),
+        end_date=timezone.now() + timezone.timedelta(hours=5),
+        event_type="Meeting",
+    )
+
+    response = APIClient().get(reverse("events-list-create"))
+
+    assert response["Content-Type"] == "application/json"
+    assert response.content == JSONRenderer().render(response.data)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b'{"name": "Wine tasting", "maximum_attendees": 10, "users": [1, 2]}',
+        '{"name": "Prova de vinhos é ✓", "nested": {"a": [null, true, 1.5]}}'.encode(),
+        b"[]",
+    ],
+)
+def test_orjson_parser_matches_json_parser(content):
+    parsed = parsers.ORJSONParser().parse(io.BytesIO(content))
+
+    assert parsed == JSONParser().parse(io.BytesIO(content))
+
+
+@pytest.mark.parametrize("content", [b'{"name": ', b"NaN", b"\xff"])
+def test_orjson_parser_parse_error(content):
+    with pytest.raises(ParseError) as excinfo:
+        parsers.ORJSONParser().parse(io.BytesIO(content))
+
+    assert str(excinfo.value.detail).startswith("JSON parse error - ")
+
+
+def test_orjson_parser_falls_back_for_other_encodings():
+    content = '{"name": "Prova de vinhos é"}'.encode("latin-1")
+
+    parsed = parsers.ORJSONParser().parse(
+        io.BytesIO(content), parser_context={"encoding": "latin-1"}
+    )
+
+    assert parsed == {"name": "Prova de vinhos é"}
+
+
+@pytest.mark.django_db
+def test_api_accepts_json_body(client_with_credentials):
+    response = client_with_credentials.post(
+        reverse("events-list-create"),
+        {
+            "name": "Wine tasting",
+            "description": "Try wines from all over Portugal",
+            "start_date": (timezone.now() + timezone.timedelta(hours=1)).isoformat(),
+            "end_date": (timezone.now() + timezone.timedelta(hours=5)).isoformat(),
+            "event_type": "Meeting",
+        },
+        format="json",
+    )
+
+    assert response.status_code == 201
+    assert response.json()["name"] == "Wine tasting"
@@ -0,0 +1,120 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+from rest_framework.test import APIClient
+
+from events.models import Event
+from events_manager import routers
+
+User = get_user_model()
+
+router = routers.ReplicaRouter()
+
+
+def serve(request, view=None):
+    """Run request through the middleware, return the response and the read alias"""
+    aliases = []
+
+    def get_response(request):
+        aliases.append(router.db_for_read(Event))
+        if view:
+            view()
+            aliases.append(router.db_for_read(Event))
+        return HttpResponse()
+
+    response = routers.replica_middleware(get_response)(request)
+    return response, aliases
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1", "replica_2"])
+def test_safe_request_reads_from_replica():
+    response, aliases = serve(RequestFactory().get("/api/events/"))
+
+    assert aliases[0] in ("replica_1", "replica_2")
+    assert routers.STICKY_COOKIE not in response.cookies
+
+
+@override_settings(DATABASE_REPLICAS=[])
+def test_safe_request_without_replicas():
+    _, aliases = serve(RequestFactory().get("/api/events/"))
+
+    assert aliases == [routers.PRIMARY]
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], DATABASE_PRIMARY_STICKY_SECONDS=5)
+def test_unsafe_request_pins_client_to_primary():
+    response, aliases = serve(RequestFactory().put("/api/events/1/subscribe/"))
+
+    assert aliases == [routers.PRIMARY]
+    cookie = response.cookies[routers.STICKY_COOKIE]
+    assert cookie["max-age"] == 5
+
+    request = RequestFactory().get("/api/events/1/")
+    request.COOKIES[routers.STICKY_COOKIE] = cookie.value
+    _, aliases = serve(request)
+    assert aliases == [routers.PRIMARY]
+
+
+def authenticate(request, user):
+    """Set the user of request as DRF does once it has authenticated it"""
+    request.user = user
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+def test_unsafe_request_pins_user_without_cookies():
+    """Test a client that drops cookies still reads its writes from the primary"""
+    user = User(pk=7)
+    request = RequestFactory().put("/api/events/1/subscribe/")
+    serve(request, view=lambda: authenticate(request, user))
+
+    assert cache.get(routers.sticky_key(user.pk))
+
+    request = RequestFactory().get("/api/events/1/")
+    _, aliases = serve(request, view=lambda: authenticate(request, user))
+    # Reads made before the view authenticated the user may use the replica
+    assert aliases == ["replica_1", routers.PRIMARY]
+
+    request = RequestFactory().get("/api/events/1/")
+    _, aliases = serve(request, view=lambda: authenticate(request, User(pk=8)))
+    assert aliases == ["replica_1", "replica_1"]
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+def test_router_leaves_lazy_session_user_alone():
+    request = RequestFactory().get("/api/events/")
+    request.user = SimpleLazyObject(lambda: pytest.fail("session user evaluated"))
+
+    _, aliases = serve(request)
+
+    assert aliases == ["replica_1"]
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+def test_write_pins_rest_of_request_to_primary():
+    _, aliases = serve(
+        RequestFactory().get("/api/events/"), view=lambda: router.db_for_write(Event)
+    )
+
+    assert aliases == ["replica_1", routers.PRIMARY]
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+def test_reads_outside_request_use_primary():
+    assert router.db_for_read(Event) == routers.PRIMARY
+    assert router.allow_migrate(routers.PRIMARY, "events")
+    assert not router.allow_migrate("replica_1", "events")
+
+
+@pytest.mark.django_db
+def test_subscribe_sets_sticky_cookie(event, valid_user):
+    client = APIClient()
+    client.force_authenticate(valid_user)
+
+    response = client.put(reverse("events-subscribe", kwargs={"pk": event.pk}))
+
+    assert response.cookies[routers.STICKY_COOKIE].value == "1"
+    assert cache.get(routers.sticky_key(valid_user.pk))
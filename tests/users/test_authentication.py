@@ -0,0 +1,155 @@
+import time
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.authentication import active_user_cache
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_active_user_cache():
+    yield
+    active_user_cache.clear()
+
+
+def client_with_token(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"JWT {token}")
+    return client
+
+
+def claims_token(user, **claims):
+    token = AccessToken.for_user(user)
+    token["email"] = user.email
+    token["is_active"] = user.is_active
+    token["is_admin"] = user.is_admin
+    for claim, value in claims.items():
+        token[claim] = value
+    return token
+
+
+def user_queries(context):
+    return [
+        query
+        for query in context.captured_queries
+        if User._meta.db_table in query["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_login_token_carries_user_claims(login_user, valid_payload):
+    response = login_user()
+
+    token = AccessToken(response.data["access"])
+    assert token["email"] == valid_payload["email"]
+    assert token["is_active"] is True
+    assert token["is_admin"] is False
+
+
+@pytest.mark.django_db
+def test_refreshed_token_keeps_user_claims(login_user, refresh_token, valid_payload):
+    response = refresh_token({"refresh": login_user().data["refresh"]})
+
+    assert AccessToken(response.data["access"])["email"] == valid_payload["email"]
+
+
+@pytest.mark.django_db
+def test_subscribe_without_user_lookup(client_with_credentials, event):
+    """Test requests within JWT_ACTIVE_CHECK_TTL of the first one load no user"""
+    url = reverse("events-subscribe", kwargs={"pk": event.pk})
+    client_with_credentials.get(
+        reverse("events-detail-update", kwargs={"pk": event.pk})
+    )
+
+    with CaptureQueriesContext(connection) as context:
+        response = client_with_credentials.put(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert user_queries(context) == []
+
+
+@pytest.mark.django_db
+def test_owner_check_with_claims_user(valid_user, event):
+    client = client_with_token(claims_token(valid_user))
+    url = reverse("events-detail-update", kwargs={"pk": event.pk})
+    client.get(url)
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.patch(url, {"name": "Beer tasting"}, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert user_queries(context) == []
+
+
+@pytest.mark.django_db
+def test_token_without_claims_falls_back_to_database(valid_user, event):
+    client = client_with_token(AccessToken.for_user(valid_user))
+    url = reverse("events-subscribe", kwargs={"pk": event.pk})
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.put(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(user_queries(context)) == 1
+
+
+@pytest.mark.django_db
+def test_inactive_claim_is_rejected(valid_user, event):
+    token = claims_token(valid_user, is_active=False)
+    url = reverse("events-subscribe", kwargs={"pk": event.pk})
+
+    response = client_with_token(token).put(url)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_active_check_ttl(client_with_credentials, valid_payload, event):
+    url = reverse("events-subscribe", kwargs={"pk": event.pk})
+    unsubscribe_url = reverse("events-unsubscribe", kwargs={"pk": event.pk})
+    assert client_with_credentials.put(url).status_code == status.HTTP_200_OK
+
+    User.objects.filter(email=valid_payload["email"]).update(is_active=False)
+    # Still within the TTL, the cached is_active is trusted
+    with CaptureQueriesContext(connection) as context:
+        response = client_with_credentials.put(unsubscribe_url)
+    assert response.status_code == status.HTTP_200_OK
+    assert user_queries(context) == []
+
+    active_user_cache.clear()
+    response = client_with_credentials.put(url)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_deactivated_user_with_refreshed_token_is_rejected_after_ttl(
+    client_with_credentials, login_user, refresh_token, valid_payload, event
+):
+    """Test a refreshed token, which keeps the is_active claim, loses access by the TTL"""
+    url = reverse("events-subscribe", kwargs={"pk": event.pk})
+    unsubscribe_url = reverse("events-unsubscribe", kwargs={"pk": event.pk})
+    refresh = login_user().data["refresh"]
+    assert client_with_credentials.put(url).status_code == status.HTTP_200_OK
+
+    User.objects.filter(email=valid_payload["email"]).update(is_active=False)
+    access = refresh_token({"refresh": refresh}).data["access"]
+    client = client_with_token(access)
+    assert AccessToken(access)["is_active"] is True
+    # Still within the TTL, the cached is_active is trusted
+    assert client.put(unsubscribe_url).status_code == status.HTTP_200_OK
+
+    expired = time.monotonic() + settings.JWT_ACTIVE_CHECK_TTL + 1
+    with mock.patch("users.authentication.time.monotonic", return_value=expired):
+        response = client.put(url)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
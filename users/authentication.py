@@ -0,0 +1,95 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+
+from .tokens import USER_CLAIMS
+
+
+class ClaimsUser(TokenUser):
+    """
+    User built from the claims of a validated access token, it has no database row
+    behind it. Compare users by id, a ClaimsUser never equals a CustomUser instance.
+    """
+
+    @cached_property
+    def email(self):
+        return self.token["email"]
+
+    @cached_property
+    def is_active(self):
+        return self.token["is_active"]
+
+    @cached_property
+    def is_admin(self):
+        return self.token["is_admin"]
+
+    @property
+    def is_staff(self):
+        return self.is_admin
+
+    def __str__(self):
+        return self.email
+
+
+class ActiveUserCache:
+    """
+    In-process cache of CustomUser.is_active, each entry lives for ttl seconds.
+    """
+
+    max_entries = 10_000
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def is_active(self, user_id, ttl):
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        is_active = get_user_model().objects.filter(pk=user_id, is_active=True).exists()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[user_id] = (now + ttl, is_active)
+        return is_active
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+active_user_cache = ActiveUserCache()
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds the user from the token claims instead of
+    loading CustomUser on every request.
+
+    Tokens issued without the claims fall back to the database lookup. is_active is
+    read again from the database at most once per user, process and
+    JWT_ACTIVE_CHECK_TTL, so a deactivated user is locked out within the TTL instead
+    of at the expiry of the refresh token.
+    """
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+
+        user = ClaimsUser(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        ttl = settings.JWT_ACTIVE_CHECK_TTL
+        if ttl and not active_user_cache.is_active(user.id, ttl):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
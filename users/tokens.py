@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+# Claims read by users.authentication.StatelessJWTAuthentication
+USER_CLAIMS = ("email", "is_active", "is_admin")
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Issues token pairs carrying the user fields the API needs.
+    Access tokens from the refresh endpoint inherit the claims of the refresh token.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token